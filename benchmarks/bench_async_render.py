@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Page with slow async data sources: awaiting every source before render vs render_async / iter_render_async.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_async_render.py"""
+import asyncio
+import time
+
+from tempy import Content
+from tempy.tags import Html, Head, Title, Body, Div, Ul
+
+DELAY = 0.05
+
+
+async def query(value):
+    await asyncio.sleep(DELAY)
+    return value
+
+
+async def rows(count):
+    for i in range(count):
+        await asyncio.sleep(DELAY / count)
+        yield i
+
+
+page = Html()(
+    Head()(Title()("Dashboard")),
+    Body()(Div()(Content("user")), Div()(Content("stats")), Ul()(Content("rows"))),
+)
+
+
+def sources():
+    return {"user": query("bob"), "stats": query("42"), "rows": rows(10)}
+
+
+async def materialized():
+    data = sources()
+    rows_list = [row async for row in data.pop("rows")]
+    values = {name: await source for name, source in data.items()}
+    return page.render(rows=rows_list, **values)
+
+
+async def streamed():
+    first = None
+    start = time.perf_counter()
+    async for _ in page.iter_render_async(chunk_size=64, **sources()):
+        first = first or time.perf_counter() - start
+    return first
+
+
+async def main():
+    renders = (("awaited one by one", materialized), ("render_async", lambda: page.render_async(**sources())))
+    for label, render in renders:
+        start = time.perf_counter()
+        await render()
+        print("%-20s %.3fs" % (label, time.perf_counter() - start))
+    start = time.perf_counter()
+    first = await streamed()
+    print("%-20s %.3fs (first chunk after %.3fs)" % ("iter_render_async", time.perf_counter() - start, first))
+
+asyncio.run(main())
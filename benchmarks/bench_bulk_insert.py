@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Building large trees: childs added one by one through __call__ vs extend_children.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_bulk_insert.py"""
+import timeit
+
+from tempy.tags import Tbody, Tr, Td
+from tempy.widgets import TempyTable
+
+ROWS = 100000
+data = [[i, "cell %d" % i, i * 2] for i in range(ROWS)]
+
+
+def call_build():
+    return Tbody()(Tr()(Td()(cell) for cell in row) for row in data)
+
+
+def extend_build():
+    return Tbody().extend_children(
+        Tr().extend_children(Td().extend_children((cell, )) for cell in row) for row in data
+    )
+
+
+for label, build in (("__call__", call_build), ("extend_children", extend_build)):
+    print("%-16s %dk rows: %.0f ms" % (label, ROWS // 1000, min(timeit.repeat(build, number=1, repeat=3)) * 1000))
+print("TempyTable       %dk rows: %.0f ms" % (
+    ROWS // 1000, min(timeit.repeat(lambda: TempyTable(data=data), number=1, repeat=3)) * 1000))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Sibling operations on every row of a large table: linear index search vs maintained positions.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_child_index.py"""
+import timeit
+
+from tempy.tempy import DOMElement
+from tempy.tags import Tbody, Tr, Td
+
+
+def linear_own_index(self):
+    """Index search as it was made before the maintained positions."""
+    if self.parent:
+        try:
+            return [id(t) for t in self.parent.childs].index(id(self))
+        except ValueError:
+            return -1
+    return -1
+
+
+def make_body(rows):
+    return Tbody()(Tr()(Td()(i)) for i in range(rows))
+
+
+def next_prev(body):
+    for row in body.childs[1:-1]:
+        row.next()
+        row.prev()
+
+
+def remove_every_other(body):
+    for row in body.childs[::2]:
+        row.remove()
+
+
+maintained_own_index = DOMElement._own_index
+for rows in (500, 2000):
+    for label, own_index in (("linear", property(linear_own_index)), ("maintained", maintained_own_index)):
+        DOMElement._own_index = own_index
+        body = make_body(rows)
+        navigation = min(timeit.repeat(lambda: next_prev(body), number=1, repeat=3))
+        bodies = iter([make_body(rows) for _ in range(3)])
+        removal = min(timeit.repeat(lambda: remove_every_other(next(bodies)), number=1, repeat=3))
+        print("%6d rows  %-10s next/prev: %8.2f ms  remove: %8.2f ms" % (
+            rows, label, navigation * 1000, removal * 1000))
+DOMElement._own_index = maintained_own_index
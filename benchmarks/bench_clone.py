@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Deep copies of trees of 10k, 100k and 1M elements: clone() vs copy.deepcopy.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_clone.py"""
+import gc
+import time
+from copy import deepcopy
+
+from tempy.tags import Table, Tr, Td
+
+
+def make_table(nodes):
+    # Every row is 4 elements
+    return Table()(Tr(klass="row")(Td()(i), Td(klass="cell")("a"), Td()("b")) for i in range(nodes // 4))
+
+
+for nodes in (10000, 100000, 1000000):
+    table = make_table(nodes)
+    for label, copy_tree in (("clone", table.clone), ("deepcopy", lambda: deepcopy(table))):
+        gc.collect()
+        start = time.perf_counter()
+        copied = copy_tree()
+        print("%8d nodes %-9s %.3fs" % (nodes, label, time.perf_counter() - start))
+        del copied
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Content resolution while rendering: find_content climbing for every placeholder vs the render scope.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_content_scope.py"""
+import json
+import os
+import timeit
+
+from tempy.content import Content
+from tempy.tags import Html, Body, Div, B, P, Table, Tr, Td
+
+FIELDS = ("height", "mass", "hair_color", "skin_color", "eye_color", "birth_year",
+          "gender", "homeworld", "created", "edited", "url")
+
+with open(os.path.join(os.path.dirname(__file__), "sw-people.json")) as people_file:
+    people = list(json.load(people_file).values())
+
+character = Div(klass="chr")(B()(Content("name")), (P()("%s:" % field, Content(field)) for field in FIELDS))
+sw_page = Html()(body=Body()(Div(klass="page")(Content("characters", t_repr=character))))
+
+# Deep page repeating the same placeholders in every row
+prices = Html()(Body()(Div()(Div()(Table()(
+    Tr()(Td()(i), Td()(Content("price")), Td()(Content("currency")), Td()(Content("note"))) for i in range(2000)
+)))))
+
+for label, render in (
+    ("sw monofile", lambda: sw_page.render(characters=people)),
+    ("repeated names", lambda: prices.render(price=10, currency="EUR", note="-")),
+):
+    timings = []
+    for scoped in (False, True):
+        Content._scoped = scoped
+        timings.append(min(timeit.repeat(render, number=20, repeat=7)))
+    print("%-15s find_content %.4fs, render scope %.4fs (x20)" % (label, *timings))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Live view update: sending the whole re-rendered page vs the patches of tempy.diff.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_diff.py"""
+import json
+import random
+import time
+
+from tempy.diff import diff
+from tempy.tags import Html, Body, H1, Table, Tr, Td
+
+ROWS, CHANGES = 5000, 20
+
+page = Html()(Body()(H1()("Dashboard"), Table()(Tr()(Td()("host-%d" % i), Td()(0), Td()("ok")) for i in range(ROWS))))
+table = page.childs[0].childs[1]
+snapshot = page.snapshot()
+rnd = random.Random(0)
+for row in rnd.sample(table.childs, CHANGES):
+    row.childs[1].childs[0] = rnd.randint(1, 100)
+    row.childs[2].add_class("changed")
+
+start = time.perf_counter()
+html = page.render()
+print("full render      %.3fs %8d bytes" % (time.perf_counter() - start, len(html)))
+start = time.perf_counter()
+new_snapshot = page.snapshot()
+snapshot_time = time.perf_counter() - start
+start = time.perf_counter()
+patches = diff(snapshot, new_snapshot)
+payload = json.dumps([patch._asdict() for patch in patches])
+print("snapshot + diff  %.3fs + %.3fs %8d bytes, %d patches" % (
+    snapshot_time, time.perf_counter() - start, len(payload), len(patches)))
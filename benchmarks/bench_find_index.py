@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Repeated find calls on a large page: recursive scan vs tree index.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_find_index.py"""
+import timeit
+
+from tempy.tags import Div, Ul, Li, A, Span
+
+
+def make_page(sections):
+    return Div()(
+        Div(klass="section")(
+            Ul()(Li()(A(href="#")(i), Span()(i)) for i in range(10)),
+            footer=Span(klass="footer"),
+        )
+        for _ in range(sections)
+    )
+
+
+def finds(page):
+    page.find(A)
+    page.find("Span")
+    page.find(names="footer")
+
+
+for sections in (100, 500):
+    page = make_page(sections)
+    nodes = len(page.find())
+    scan = min(timeit.repeat(lambda: finds(page), number=10, repeat=3))
+    build = min(timeit.repeat(lambda: page.drop_index().build_index(), number=1, repeat=3))
+    indexed = min(timeit.repeat(lambda: finds(page), number=10, repeat=3))
+    print("%7d nodes: scan %.4fs, index build %.4fs, indexed %.4fs (10 x 3 finds)" % (nodes, scan, build, indexed))
+    page.drop_index()
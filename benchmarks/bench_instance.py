@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Per-request page variants of a 5k nodes layout: clone() vs Prototype instances.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_instance.py"""
+import time
+
+from tempy import Content, Prototype
+from tempy.tags import Html, Head, Title, Body, Div, Nav, A, Ul, Li, P, Footer
+
+layout = Html()(
+    Head()(Title()(Content("title"))),
+    Body()(
+        Nav()(A(href="/%d" % i)("link %d" % i) for i in range(200)),
+        Div(id="main")(Div(klass="card")(P()("card %d" % i), Ul()(Li()(j) for j in range(5))) for i in range(500)),
+        Footer()(P()("footer")),
+    ),
+)
+base = Prototype(layout)
+REQUESTS = 200
+
+
+def variant(make):
+    page = make()
+    page.inject(title="Hello")
+    page.childs[1].childs[1].attr(klass="logged")
+    return page
+
+
+for label, make in (("clone", layout.clone), ("instance", base.instance)):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        variant(make)
+    made = (time.perf_counter() - start) / REQUESTS
+    start = time.perf_counter()
+    for _ in range(REQUESTS // 10):
+        variant(make).render()
+    rendered = (time.perf_counter() - start) / (REQUESTS // 10)
+    print("%-10s variant %9.1fus   variant + render %7.2fms" % (label, made * 1e6, rendered * 1e3))
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Large tables rendered serially vs in worker processes (tempy.parallel.ParallelRenderer).
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_parallel_render.py"""
+import os
+import time
+
+from tempy import Content
+from tempy.tags import Html, Body, Table, Tr, Td, A
+from tempy.parallel import ParallelRenderer
+
+ROWS = 20000
+
+
+def make_page():
+    return Html()(Body()(Table()(
+        Tr(klass="row")(Td()(i), Td()(A(href="/item/%d" % i)(Content("label"))), Td()("x" * 20)) for i in range(ROWS)
+    )))
+
+
+page = make_page()
+start = time.perf_counter()
+serial = page.render(label="open")
+print("%-22s %.3fs" % ("serial", time.perf_counter() - start))
+for workers in sorted({2, os.cpu_count() or 1}):
+    renderer = ParallelRenderer(workers=workers)
+    start = time.perf_counter()
+    assert renderer.render(page, label="open") == serial
+    print("%-22s %.3fs" % ("%d workers" % workers, time.perf_counter() - start))
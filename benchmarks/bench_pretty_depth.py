@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Pretty rendering of deep trees: recursive root/_depth properties vs cached ancestries.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_pretty_depth.py"""
+import sys
+import timeit
+
+from tempy.tempy import DOMElement
+from tempy.tags import Div, Ul, Li
+
+
+def recursive_root(self):
+    return self.parent.root if self.parent else self
+
+
+def recursive_depth(self):
+    return 0 if self.root == self else self.parent._depth + 1
+
+
+def make_page(depth, width):
+    top = node = Div()
+    for _ in range(depth):
+        node(Ul()(Li()(i) for i in range(width)))
+        child = Div()
+        node(child)
+        node = child
+    return top
+
+
+cached = DOMElement.root, DOMElement._depth
+sys.setrecursionlimit(10000)
+for depth in (25, 50, 100, 200):
+    page = make_page(depth, 10)
+    timings = []
+    for root, depth_property in ((property(recursive_root), property(recursive_depth)), cached):
+        DOMElement.root, DOMElement._depth = root, depth_property
+        timings.append(min(timeit.repeat(lambda: page.render(pretty=True), number=1, repeat=1)))
+    print("depth %4d: recursive %.4fs, cached %.4fs" % (depth, *timings))
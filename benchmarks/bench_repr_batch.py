@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Rendering lists of objects through their TempyREPR: one view per object vs batched runs.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_repr_batch.py"""
+import timeit
+
+from tempy import TempyREPR, Content
+from tempy.tags import Ul, Li, B, Span
+from tempy.renderer import ObjectBatch
+
+
+class Product:
+    def __init__(self, name, price):
+        self.name = name
+        self.price = price
+
+    class Ul(TempyREPR):
+        _shared_skeleton = True
+
+        def repr(self):
+            self(Li()(B()(Content("name")), Span()(Content("price"))))
+
+
+class ReadingProduct(Product):
+    class Ul(TempyREPR):
+        def repr(self):
+            self(Li()(B()(self.name), Span()(self.price)))
+
+
+def unbatched(container, objects):
+    return "".join(container._render_object(obj) for obj in objects)
+
+
+for cls in (Product, ReadingProduct):
+    objects = [cls("product %d" % i, i + 1) for i in range(10000)]
+    container = Ul()
+    single = min(timeit.repeat(lambda: unbatched(container, objects), number=1, repeat=5))
+    batched = min(timeit.repeat(lambda: "".join(map(ObjectBatch(container).render, objects)), number=1, repeat=5))
+    print("%-15s one by one: %.1f ms  batched: %.1f ms" % (cls.__name__, single * 1000, batched * 1000))
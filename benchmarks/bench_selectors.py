@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Css selector lookups on a large page: hand written recursive loop vs find, with and without the tree index.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_selectors.py"""
+import timeit
+
+from tempy.tags import Div, Ul, Li, A, Span
+
+
+def make_page(sections):
+    return Div()(
+        Div(klass="section")(
+            Ul()(Li()(A(href="#%d" % i, klass="link" if i % 3 else "link first")(i), Span()(i)) for i in range(10)),
+        )
+        for _ in range(sections)
+    )
+
+
+def hand_written(element, found):
+    for child in element.childs:
+        if isinstance(child, A) and "first" in child.attrs["klass"] and child.parent.parent.parent.has_class("section"):
+            found.add(child)
+        if isinstance(child, Div) or isinstance(child, Ul) or isinstance(child, Li):
+            hand_written(child, found)
+    return found
+
+
+SELECTOR = ".section li > a.first"
+
+for sections in (100, 1000):
+    page = make_page(sections)
+    assert hand_written(page, set()) == page.find(SELECTOR)
+    loop = min(timeit.repeat(lambda: hand_written(page, set()), number=10, repeat=3))
+    scan = min(timeit.repeat(lambda: page.find(SELECTOR), number=10, repeat=3))
+    page.build_index()
+    indexed = min(timeit.repeat(lambda: page.find(SELECTOR), number=10, repeat=3))
+    page.drop_index()
+    print("%5d sections: loop %.4fs, find %.4fs, indexed find %.4fs (x10)" % (sections, loop, scan, indexed))
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Static subtrees markup cache: first render of a new tree, re-render of a page with a small dynamic region.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_static_cache.py"""
+import timeit
+
+from tempy import Content
+from tempy.renderer import DOMRenderer
+from tempy.tags import Html, Head, Body, Title, Div, Ul, Li, A, P, Table, Tr, Td, Span
+
+
+def make_table():
+    return Table()(Tr()(Td()(Span()(row)) for _ in range(4)) for row in range(1111))
+
+
+def make_page():
+    return Html()(
+        Head()(Title()("Benchmark")),
+        Body()(
+            Div(klass="navbar")(Ul()(Li()(A(href="/page/%d" % i)("Page %d" % i)) for i in range(200))).cache_markup(),
+            Div(klass="content")(P()(Content("message"))),
+            make_table().cache_markup(),
+            Div(klass="footer")(P()("Footer text %d" % i) for i in range(200)).cache_markup(),
+        ),
+    )
+
+
+def run(label, stmt, number):
+    # Without the cache: every element is considered dynamic
+    static_markup = DOMRenderer._static_markup
+    DOMRenderer._static_markup = lambda self: False
+    uncached = min(timeit.repeat(stmt(), number=number, repeat=5)) / number
+    DOMRenderer._static_markup = static_markup
+    cached = min(timeit.repeat(stmt(), number=number, repeat=5)) / number
+    print("%-25s uncached: %7.3f ms  cached: %7.3f ms" % (label, uncached * 1000, cached * 1000))
+
+
+def render_new_table():
+    tables = iter([make_table().cache_markup() for _ in range(50)])
+    return lambda: next(tables).render()
+
+
+def rerender_page():
+    page = make_page()
+    return lambda: page.render(message="hello")
+
+
+run("first render, 10k nodes", render_new_table, 10)
+run("page re-render", rerender_page, 20)
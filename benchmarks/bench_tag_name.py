@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Tag name resolution: MRO walk on every call vs name cached on the class.
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_tag_name.py"""
+import timeit
+
+from tempy.elements import Tag
+from tempy.tags import Div, Table, Tr, Td, Span
+
+
+def mro_get__tag(self):
+    """Tag name resolution as it was made before the per-class cache."""
+    for cls in self.__class__.__mro__:
+        try:
+            return getattr(self, "_%s__tag" % cls.__name__)
+        except AttributeError:
+            pass
+
+
+class SubclassedTd(Td):
+    pass
+
+
+# ~10k nodes: 1 div + 1 table + 1111 rows * (1 tr + 4 td + 4 span)
+tree = Div()(
+    Table()(
+        Tr()(SubclassedTd()(Span()(row)) for _ in range(4)) for row in range(1111)
+    )
+)
+nodes = [node for node in tree.dfs_preorder() if isinstance(node, Tag)]
+print("Tag nodes:", len(nodes))
+
+cached_get__tag = Tag._get__tag
+for label, get__tag in (("mro walk", mro_get__tag), ("cached", cached_get__tag)):
+    Tag._get__tag = get__tag
+    lookups = min(timeit.repeat(lambda: [n._get__tag() for n in nodes], number=10, repeat=5)) / 10
+    render = min(timeit.repeat(tree.render, number=10, repeat=5)) / 10
+    print("%-10s lookups: %.2f ms  render: %.2f ms" % (label, lookups * 1000, render * 1000))
+Tag._get__tag = cached_get__tag
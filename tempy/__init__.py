@@ -12,6 +12,8 @@ if sys.version_info < (3, 3):
 
 _shortcuts = {
     "render_template": "tools",
+    "compile_template": "compiler",
+    "StreamingResponse": "streaming",
     "Tag": "elements",
     "VoidTag": "elements",
     "Css": "css",
@@ -20,6 +22,7 @@ _shortcuts = {
     "TempyPlace": "tempyrepr",
     "T": "t",
     "Escaped": "tempy",
+    "Prototype": "prototype",
 }
 
 
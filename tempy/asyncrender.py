@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Async rendering: awaitables and async iterables given as content of the Content placeholders
+are resolved while rendering (see tempy.sources). Requires Python >= 3.6.
+This module is imported only when used, by DOMRenderer.render_async, DOMRenderer.iter_render_async and
+StreamingResponse.asgi: the rest of Tempy works on Python versions without async syntax.
+"""
+import asyncio
+
+from .context import SourcesContext, isolated
+from .renderer import DEFAULT_CHUNK_SIZE
+from .sources import AsyncSource, collect_sources, resolve_sources
+
+
+async def render_async(element, *args, **kwargs):
+    """Async version of render. Awaitables and async iterables found as content of the Content placeholders
+    (injected, or given as render args and kwargs) are resolved concurrently, then the tree is rendered.
+    Async iterables are rendered as lists. Same api as render for last minute content injection."""
+    pretty = kwargs.pop("pretty", False)
+    with element._render_context(args, kwargs):
+        sources = collect_sources(element)
+        await resolve_sources(sources.values())
+        with SourcesContext(sources):
+            return "".join(element._iter_render_parts(pretty=pretty))
+
+
+def _iter_sourced_render_parts(element, args, kwargs, pretty=False):
+    """Yields the async sources of the element's tree, then its markup.
+    The Content placeholders using a source not yet resolved yield the source itself."""
+    with element._render_context(args, kwargs):
+        sources = collect_sources(element)
+        yield sources
+        with SourcesContext(sources):
+            yield from element._iter_render_parts(pretty=pretty)
+
+
+async def iter_render_async(element, *args, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Async generator version of iter_render, see render_async.
+    All the async sources are started concurrently when the rendering starts, the markup is yielded
+    as soon as the sources it needs are resolved: the page head is sent while slow sources are still loading.
+    """
+    pretty = kwargs.pop("pretty", False)
+    parts = isolated(_iter_sourced_render_parts(element, args, kwargs, pretty))
+    sources = next(parts)
+    tasks = [source.start() for source in sources.values()]
+    try:
+        eager = [source.task for source in sources.values() if source.eager]
+        if eager:
+            await asyncio.gather(*eager)
+        buffer, size = [], 0
+        for part in parts:
+            if isinstance(part, AsyncSource):
+                if buffer:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                await part.task
+                continue
+            buffer.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        for task in tasks:
+            task.cancel()
+        parts.close()
+
+
+async def asgi_response(response, scope, receive, send):
+    """Sends a StreamingResponse as an ASGI http response, see StreamingResponse.asgi."""
+    await send({
+        "type": "http.response.start",
+        "status": response.status.value,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers],
+    })
+    async for chunk in iter_render_async(
+            response.tree, *response._render_args, chunk_size=response.chunk_size, pretty=response.pretty,
+            **response._render_kwargs
+    ):
+        await send({"type": "http.response.body", "body": chunk.encode(response.encoding), "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -4,6 +4,8 @@
 
 
 class TempyClass:
+	__slots__ = ()
+
 	_FORMAT_ATTRS = {
 		"style": lambda x: " ".join("%s: %s;" % (k, v) for k, v in x.items()),
 		"klass": " ".join,
@@ -14,13 +16,8 @@ class TempyClass:
 	_MAPPING_ATTRS = ("style",)
 	_SET_VALUES_ATTRS = ("klass",)
 
-	def __init__(self, **kwargs):
-		self.parent = None
-		self.childs = []
-		self._name = None
-		self.root = None
-		self.attrs = {}
-		self._depth = 0
-		self._from_factory = False
-		self._own_index = 0
-		self.content_data = kwargs
+
+def tag_name_of(element):
+	"""Tag name of a Tempy element or class, None for the elements without a tag (see Tag._class_tag)."""
+	class_tag = getattr(element, "_class_tag", None)
+	return class_tag() if class_tag else None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Compilation of Tempy trees into flat python render functions"""
+from functools import partial
+
+from .renderer import child_dispatch, LEAF, SPLIT, _escape_object
+
+
+def _inlined(element):
+    """True for the elements compiled as static markup around their childs."""
+    return child_dispatch(element)[0] == SPLIT
+
+
+class CompiledTemplate:
+    """Callable produced by the TempyCompiler.
+    Calling it renders the tree it has been compiled from, the given args and kwargs are used
+    as in Tag.render for last minute content injection (the tree is not modified).
+    The compiled function is a snapshot of the tree structure: modifications made to the tree
+    after the compilation are not reflected in the output, the tree should be compiled again (see stale).
+    """
+
+    def __init__(self, tree, source, func):
+        self.tree = tree
+        self.source = source
+        self._func = func
+
+    @property
+    def stale(self):
+        """True if the tree has been modified by the DOMModifier methods since the compilation.
+        The compiler marks the walked elements as the render walk does, modifications drop the marks
+        up to the root (see DOMRenderer._invalidate_html). Direct writes to the childs lists or to the
+        attrs dicts are not detected."""
+        return self.tree._html_cache is None and self.tree._splittable()
+
+    def __repr__(self):
+        return "<%s.%s of %r>" % (self.__module__, type(self).__name__, self.tree)
+
+    def __call__(self, *args, **kwargs):
+        with self.tree._render_context(args, kwargs):
+            return self._func()
+
+    render = __call__
+
+
+class TempyCompiler:
+    """Translates a Tempy tree in the source of a python function.
+    Static parts of the tree (tags, attributes, strings) are pre-rendered as string literals,
+    Content placeholders, TempyREPR objects and elements with a custom render method
+    are rendered at call time.
+    """
+
+    _FUNC_NAME = "_tempy_render"
+
+    def __init__(self, tree, pretty=False):
+        self.tree = tree
+        self.pretty = pretty
+        self._chunks = []
+        self._dynamics = []
+
+    def _static(self, chunk):
+        if self._chunks and isinstance(self._chunks[-1], str):
+            self._chunks[-1] += chunk
+        else:
+            self._chunks.append(chunk)
+
+    def _dynamic(self, render_func):
+        self._chunks.append(len(self._dynamics))
+        self._dynamics.append(render_func)
+
+    def _compile_child(self, container, child):
+        """Compiles a child not walked, returns True if it's static."""
+        # Childs are classified as in the render walk (see tempy.renderer.child_dispatch)
+        kind, render = child_dispatch(child)
+        if kind == LEAF and render is not _escape_object:
+            self._static(render(child))
+            return True
+        self._dynamic(partial(container._render_child, child, self.pretty))
+        return False
+
+    def _compile_tree(self):
+        """Walks the tree with an explicit stack (see DOMNavigator._traverse): the markup of splittable
+        elements is static, the other childs are compiled by _compile_child.
+        Walked elements are marked as static or dynamic, as in DOMRenderer._walk_split_parts."""
+        tree = self.tree
+        if not tree._splittable():
+            self._dynamic(partial(tree.render, pretty=self.pretty))
+            return
+        stack = []
+        for node, entering in tree._traverse(expand=_inlined):
+            if entering:
+                opening, closing = node._render_split(pretty=self.pretty)
+                self._static(opening)
+                stack.append([node, closing, node._static_markup()])
+            elif entering is False:
+                _, closing, static = stack.pop()
+                if not node._void:
+                    self._static(closing)
+                if node._html_cache is None:
+                    node._html_cache = static
+                if not static and stack:
+                    stack[-1][2] = False
+            elif not self._compile_child(stack[-1][0], node):
+                stack[-1][2] = False
+
+    def _source(self):
+        parts = [
+            repr(chunk) if isinstance(chunk, str) else "_dyn_%d()" % chunk
+            for chunk in self._chunks
+        ]
+        return "def %s():\n    return \"\".join((\n        %s,\n    ))\n" % (
+            self._FUNC_NAME,
+            ",\n        ".join(parts or ['""']),
+        )
+
+    def compile(self):
+        """Returns a CompiledTemplate rendering the tree."""
+        self._chunks, self._dynamics = [], []
+        self._compile_tree()
+        source = self._source()
+        namespace = {"_dyn_%d" % i: func for i, func in enumerate(self._dynamics)}
+        exec(compile(source, "<tempy compiled %s>" % type(self.tree).__name__, "exec"), namespace)
+        return CompiledTemplate(self.tree, source, namespace[self._FUNC_NAME])
+
+
+def compile_template(tree, pretty=False):
+    """Compiles a Tempy tree into a CompiledTemplate, a callable with the same api of Tag.render."""
+    return TempyCompiler(tree, pretty=pretty).compile()
@@ -4,7 +4,9 @@
 from types import GeneratorType
 
 from .tempy import DOMElement
-from .exceptions import ContentError
+from .renderer import child_dispatch, OBJECT, ObjectBatch
+from .context import current_sources
+from .exceptions import ContentError, WrongContentError
 
 
 class Content(DOMElement):
@@ -26,6 +28,8 @@ class Content(DOMElement):
         self._t_repr = t_repr
         if self._t_repr and not isinstance(self._t_repr, DOMElement):
             raise ContentError(self, "template argument should be a DOMElement")
+        # pretty -> CompiledTemplate of the template, see _compiled_template
+        self._compiled = {}
 
     def __eq__(self, other):
         if self.__class__ != other.__class__:
@@ -36,14 +40,25 @@ class Content(DOMElement):
         ]
         return comp_dicts[0] == comp_dicts[1]
 
-    def __copy__(self):
-        return self.__class__(self._name, self._fixed_content, self._t_repr)
+    _scoped = True
 
     @property
     def content(self):
+        return self._iter_contents()
+
+    def _raw_content(self, scope=None):
+        """Returns the content to render. The named content is searched in the parents, or in the given
+        render scope of the parent (see tempy.context.ContentScope)."""
         content = self._fixed_content
         if not content and self.parent:
-            content = self.parent.find_content(self._name)
+            content = scope.resolve(self._name) if scope is not None else self.parent.find_content(self._name)
+        return content
+
+    def _iter_contents(self, scope=None):
+        return self._iter_values(self._raw_content(scope))
+
+    @staticmethod
+    def _iter_values(content):
         if isinstance(content, DOMElement) or content:
             if isinstance(content, DOMElement):
                 yield content
@@ -72,21 +87,66 @@ class Content(DOMElement):
                 ret.append(str(v))
         return ret
 
-    def render(self, *args, **kwargs):
-        pretty = kwargs.pop("pretty", False)
-        ret = []
-        for content in self.content:
+    def _compiled_template(self, pretty=False):
+        """Returns the template compiled, compiled again only when the template is replaced or modified."""
+        compiled = self._compiled.get(pretty)
+        if compiled is None or compiled.tree is not self._t_repr or compiled.stale:
+            compiled = self._t_repr.compile(pretty=pretty)
+            # A new dict: clones of this Content share the old one
+            self._compiled = dict(self._compiled)
+            self._compiled[pretty] = compiled
+        return compiled
+
+    def _item_renderer(self, pretty=False):
+        """Returns a function rendering the template with a content item.
+        The template is compiled once, every item is bound to the template only for the duration
+        of its render (see tempy.context): the template itself is never modified."""
+        compiled = self._compiled_template(pretty=pretty)
+
+        def render_item(item):
+            if item and not isinstance(item, dict):
+                raise WrongContentError(self._t_repr, item, "contents should be a dict")
+            return compiled(item)
+
+        return render_item
+
+    def _iter_render_parts(self, pretty=False, scope=None):
+        separator = ""
+        batch = None
+        render_item = None
+        content = self._raw_content(scope)
+        sources = current_sources()
+        if sources:
+            source = sources.get(id(content))
+            if source is not None:
+                if not source.done:
+                    # Streaming async render: the source is awaited before resuming (see tempy.sources)
+                    yield source
+                content = source.value
+        for content in self._iter_values(content):
             if content is None:
                 continue
             if isinstance(content, DOMElement):
-                ret.append(content.render(pretty=pretty))
+                renders = (content._iter_render_parts(pretty=pretty), )
             elif self._t_repr:
-                ret.append(self._t_repr.inject(content).render(pretty=pretty))
+                render_item = render_item or self._item_renderer(pretty=pretty)
+                renders = ((render_item(content), ), )
             elif isinstance(content, dict):
-                ret.extend(self._render_dict(content))
+                renders = ((rendered, ) for rendered in self._render_dict(content))
+            elif self.parent and child_dispatch(content)[0] == OBJECT:
+                # Objects with TempyREPRs are rendered as childs of the Content's parent
+                batch = batch or ObjectBatch(self.parent, pretty=pretty)
+                renders = ((batch.render(content), ), )
             else:
-                ret.append(str(content))
-        return " ".join(ret)
+                renders = ((str(content), ), )
+            for parts in renders:
+                yield separator
+                yield from parts
+                separator = " "
+
+    def render(self, *args, **kwargs):
+        pretty = kwargs.pop("pretty", False)
+        return "".join(self._iter_render_parts(pretty=pretty))
 
     def apply_function(self, format_function):
         for index, content in enumerate(filter(lambda c: c is not None, self.content)):
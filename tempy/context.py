@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Render context: content data given at render time is bound to the rendered element
+without modifying the tree, so the same tree can be rendered concurrently.
+Bindings are isolated per thread and per asyncio task."""
+from types import MappingProxyType
+
+try:
+    from contextvars import ContextVar, copy_context
+except ImportError:  # Python < 3.7, bindings are isolated per thread only
+    import threading
+
+    copy_context = None
+
+    class ContextVar(threading.local):
+        def __init__(self, name, default=None):
+            super().__init__()
+            self._default = default
+
+        def get(self):
+            return getattr(self, "_value", self._default)
+
+        def set(self, value):
+            token = self.get()
+            self._value = value
+            return token
+
+        def reset(self, token):
+            self._value = token
+
+
+_bindings = ContextVar("tempy_render_bindings", default=None)
+_sources = ContextVar("tempy_render_sources", default=None)
+
+
+def current_bindings():
+    """Returns the active bindings as a mapping of element ids to content data, or None."""
+    return _bindings.get()
+
+
+def current_sources():
+    """Returns the async sources of the current async render as a mapping of source ids
+    to tempy.sources.AsyncSource, or None."""
+    return _sources.get()
+
+
+class RenderContext:
+    """Context manager binding the given content data to an element for the duration of a render.
+    Bindings are never modified in place, every binding creates a new mapping: a render never sees
+    the data of another render, even when rendering the same element."""
+
+    __slots__ = ("element", "data", "_token")
+
+    def __init__(self, element, data):
+        self.element = element
+        self.data = data
+        self._token = None
+
+    def __enter__(self):
+        bindings = dict(_bindings.get() or {})
+        key = id(self.element)
+        data = dict(bindings.get(key, {}))
+        data.update(self.data)
+        bindings[key] = MappingProxyType(data)
+        self._token = _bindings.set(bindings)
+        return self
+
+    def __exit__(self, *exc):
+        _bindings.reset(self._token)
+
+
+class SourcesContext:
+    """Context manager making the given async sources visible to the Content placeholders
+    for the duration of a render."""
+
+    __slots__ = ("sources", "_token")
+
+    def __init__(self, sources):
+        self.sources = sources
+        self._token = None
+
+    def __enter__(self):
+        self._token = _sources.set(self.sources)
+        return self
+
+    def __exit__(self, *exc):
+        _sources.reset(self._token)
+
+
+class BindingsContext:
+    """Context manager activating the given bindings (as returned by current_bindings) for the duration of a render,
+    used to render parts of a tree in a worker process with the bindings of the main process render."""
+
+    __slots__ = ("bindings", "_token")
+
+    def __init__(self, bindings):
+        self.bindings = bindings
+        self._token = None
+
+    def __enter__(self):
+        self._token = _bindings.set(self.bindings)
+        return self
+
+    def __exit__(self, *exc):
+        _bindings.reset(self._token)
+
+
+class _NoContext:
+    """Context manager used when no content data is given at render time."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_CONTEXT = _NoContext()
+
+
+class ContentScope:
+    """Content data visible from an element during a render: like a ChainMap, the chain of the content data
+    of the element and of its ancestors, with the render bindings of each element before its own content data.
+    Every name is resolved once, the result is shared by all the Content placeholders using this scope."""
+
+    __slots__ = ("maps", "_resolved")
+
+    def __init__(self, maps):
+        self.maps = maps
+        self._resolved = {}
+
+    def child(self, element, bindings):
+        """Returns the scope of a child element, the same scope if the child adds no content data."""
+        data = element.content_data
+        bound = bindings.get(id(element)) if bindings else None
+        # Empty content data is skipped, unless it's a mapping resolving missing keys (ReprContentData)
+        if not data and not bound and type(data) is dict:
+            return self
+        return ContentScope(((bound, data) if bound else (data, )) + self.maps)
+
+    def resolve(self, name):
+        """Same result as DOMNavigator.find_content."""
+        try:
+            return self._resolved[name]
+        except KeyError:
+            value = ""
+            for mapping in self.maps:
+                try:
+                    value = mapping[name]
+                    break
+                except KeyError:
+                    pass
+            self._resolved[name] = value
+            return value
+
+
+_ROOT_SCOPE = ContentScope(())
+
+
+def content_scope(element, scopes):
+    """Returns the ContentScope of the element. scopes maps element ids to the scopes already built
+    during the current render, only the elements missing from it are added."""
+    chain = []
+    node = element
+    while node:
+        scope = scopes.get(id(node))
+        if scope is not None:
+            break
+        chain.append(node)
+        node = node.parent
+    else:
+        scope = _ROOT_SCOPE
+    bindings = _bindings.get()
+    for node in reversed(chain):
+        scope = scopes[id(node)] = scope.child(node, bindings)
+    return scope
+
+
+def isolated(generator):
+    """Runs every step of the given generator in its own copy of the current context,
+    so bindings made by a suspended generator don't leak in the caller."""
+    if copy_context is None:
+        yield from generator
+        return
+    context = copy_context()
+    try:
+        while True:
+            try:
+                yield context.run(next, generator)
+            except StopIteration:
+                return
+    finally:
+        context.run(generator.close)
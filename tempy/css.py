@@ -111,9 +111,7 @@ class Css(Tag):
             elif isinstance(parent, Tag):
                 result.append(self._render_tag_to_css(parent))
             elif inspect.isclass(parent):
-                result.append(
-                    getattr(parent, "_" + parent.__name__ + "__tag") + " "
-                )
+                result.append(parent._class_tag() + " ")
             elif isinstance(parent, DOMElement):
                 result.append(
                     self.__class__.render_dom_element_to_css(parent) + " "
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Tree diffing: patch operations transforming the markup of a tree into the markup of another tree,
+or of the same tree after some modifications.
+Usage for live views:
+    snapshot = page.snapshot()
+    ... page is modified ...
+    new_snapshot = page.snapshot()
+    patches = diff(snapshot, new_snapshot)  # or page.diff(snapshot)
+Every patch carries the markup of the changed node, see Patch.
+Patches address the DOM nodes the markup is parsed to (as in Node.childNodes), so they can be applied
+to a live page: the markup of every run of childs that aren't rendered as a tag (texts, Contents,
+objects, elements with a custom render) is parsed to know how many nodes it makes.
+Markup corrected by the browser's parser (i.e. implicit tbody elements) is not taken into account.
+"""
+from collections import namedtuple
+from difflib import SequenceMatcher
+from html.parser import HTMLParser
+
+from .renderer import child_dispatch, SPLIT, _attrs_items
+
+REPLACE, SET_ATTR, REMOVE_ATTR, INSERT, REMOVE = "replace", "set_attr", "remove_attr", "insert", "remove"
+
+
+class Patch(namedtuple("Patch", ("op", "path", "index", "attr", "html"))):
+    """A patch operation, patches are meant to be applied in the given order.
+    path: positions of the node in its ancestors' child nodes, from the root: () is the root itself.
+    Positions count the DOM child nodes: elements, comments and texts (adjacent texts are a single node).
+    REPLACE: replaces the node at path with html.
+    SET_ATTR / REMOVE_ATTR: sets the attribute attr of the node at path to html (the attribute value) / removes it.
+    INSERT: inserts html (one or more nodes) before the child node at index of the node at path
+    (after the last one if index is the number of child nodes).
+    REMOVE: removes the child node at index of the node at path.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, op, path, index=None, attr=None, html=None):
+        return super().__new__(cls, op, path, index, attr, html)
+
+
+class Snapshot:
+    """Immutable record of the markup of a rendered tree.
+    Elements rendered as opening tag, childs and closing tag keep their tag name, attributes and childs snapshots.
+    Consecutive childs rendered otherwise (text, Contents, objects, elements with a custom render) are kept
+    as a single snapshot of their markup only (tag is None), runs rendered as an empty string are not kept.
+    extra is the markup added to the opening and closing tags by elements with a custom _render_split
+    (i.e. the href text of an empty A), None for the others.
+    nodes is the number of DOM nodes of the markup: 1 for elements."""
+
+    __slots__ = ("tag", "attrs", "childs", "html", "extra", "nodes")
+
+    def __init__(self, tag, attrs, childs, html, extra=None, nodes=1):
+        self.tag = tag
+        self.attrs = attrs
+        self.childs = childs
+        self.html = html
+        self.extra = extra
+        self.nodes = nodes
+
+    def __repr__(self):
+        return "<%s.%s %s>" % (self.__module__, type(self).__name__, self.tag or repr(self.html[:20]))
+
+
+# Elements without closing tag, not counted as open when their start tag is not self-closed
+_VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+))
+
+
+class _NodesCounter(HTMLParser):
+    """Counts the top level DOM nodes of a markup: elements, comments, declarations and texts,
+    adjacent texts are a single node."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.nodes = 0
+        self._depth = 0
+        self._in_text = False
+
+    def _node(self, text=False):
+        if not self._depth and not (text and self._in_text):
+            self.nodes += 1
+        self._in_text = text and not self._depth
+
+    def handle_starttag(self, tag, attrs):
+        self._node()
+        if tag not in _VOID_ELEMENTS:
+            self._depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._node()
+
+    def handle_endtag(self, tag):
+        if tag not in _VOID_ELEMENTS and self._depth:
+            self._depth -= 1
+
+    def handle_data(self, data):
+        self._node(text=True)
+
+    def handle_comment(self, data):
+        self._node()
+
+    handle_decl = handle_pi = handle_comment
+
+
+def _count_nodes(markup):
+    """Number of top level DOM nodes the markup is parsed to."""
+    if "<" not in markup:
+        return 1 if markup else 0
+    counter = _NodesCounter()
+    counter.feed(markup)
+    counter.close()
+    return counter.nodes
+
+
+def _markup_run(snapshots, run):
+    """Adds the snapshot of the markup of the childs in run to snapshots, and empties run."""
+    html = "".join(run)
+    del run[:]
+    if html:
+        snapshots.append(Snapshot(None, None, (), html, nodes=_count_nodes(html)))
+
+
+def _rendered_attrs(element):
+    """Attributes of the element as rendered: html names mapped to the html values, "" for boolean attributes."""
+    attrs = {}
+    for key, value in _attrs_items(element.attrs):
+        if value:
+            formatter = element._FORMAT_ATTRS.get(key)
+            attrs[element._SPECIAL_ATTRS.get(key, key)] = (
+                "" if value is bool else formatter(value) if formatter else str(value)
+            )
+    return attrs
+
+
+def _extra_markup(element, opening, closing):
+    """Markup added by the element's _render_split to the standard opening and closing tags, None if there's none."""
+    from .elements import Tag
+    if type(element)._render_split is Tag._render_split:
+        return None
+    tag_opening, tag_closing = Tag._render_split(element)
+    if (opening, closing) == (tag_opening, tag_closing):
+        return None
+    return opening.replace(tag_opening, "", 1), closing.replace(tag_closing, "", 1)
+
+
+def snapshot(element, *args, **kwargs):
+    """Returns the Snapshot of the element, same api as render for last minute content injection."""
+    with element._render_context(args, kwargs):
+        if not element._splittable():
+            return Snapshot(None, None, (), element.render())
+        # Postorder walk with an explicit stack: every element snapshot needs its childs snapshots.
+        # The markup of the childs not rendered as tags is collected in the current run
+        stack = [(element, iter(element.childs), [], [])]
+        while stack:
+            node, childs, snapshots, run = stack[-1]
+            for child in childs:
+                if child_dispatch(child)[0] == SPLIT:
+                    _markup_run(snapshots, run)
+                    stack.append((child, iter(child.childs), [], []))
+                    break
+                run.append(node._render_child(child))
+            else:
+                stack.pop()
+                _markup_run(snapshots, run)
+                opening, closing = node._render_split()
+                node_snapshot = Snapshot(
+                    node._get__tag(), _rendered_attrs(node), tuple(snapshots),
+                    "".join((opening, "".join(child.html for child in snapshots), closing)),
+                    _extra_markup(node, opening, closing),
+                )
+                if not stack:
+                    return node_snapshot
+                stack[-1][2].append(node_snapshot)
+
+
+def diff(old, new):
+    """Returns the list of Patch transforming the markup of old into the markup of new.
+    old and new can be Snapshots or elements (snapshotted without render time content data).
+    Childs are matched on their markup: unchanged childs are kept, changed ones are patched in place
+    when their tag doesn't change, replaced otherwise."""
+    old = old if isinstance(old, Snapshot) else snapshot(old)
+    new = new if isinstance(new, Snapshot) else snapshot(new)
+    patches = []
+    # Explicit stack of patches and of couples of nodes to diff, in the order they're applied:
+    # the patches of a changed child are applied before the patches of its previous siblings
+    stack = [(old, new, ())]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Patch):
+            patches.append(item)
+            continue
+        old, new, path = item
+        if old.html == new.html:
+            continue
+        if old.tag is None or old.tag != new.tag or old.extra != new.extra:
+            # Markup added by a custom _render_split can't be patched as attributes or childs
+            if not path or old.nodes == new.nodes == 1:
+                patches.append(Patch(REPLACE, path, html=new.html))
+            else:
+                # Runs of markup making a different number of nodes
+                parent, index = path[:-1], path[-1]
+                patches.extend(Patch(REMOVE, parent, index=index) for _ in range(old.nodes))
+                if new.nodes:
+                    patches.append(Patch(INSERT, parent, index=index, html=new.html))
+            continue
+        for attr, value in new.attrs.items():
+            if old.attrs.get(attr) != value:
+                patches.append(Patch(SET_ATTR, path, attr=attr, html=value))
+        for attr in old.attrs:
+            if attr not in new.attrs:
+                patches.append(Patch(REMOVE_ATTR, path, attr=attr))
+        stack.extend(reversed(_diff_childs(old.childs, new.childs, path)))
+    return patches
+
+
+def _diff_childs(old, new, path):
+    """Returns the insert and remove patches of the childs of the node at path, and the couples of changed childs
+    to be diffed, in the order they're applied. Blocks of changes are handled from the last one,
+    so the nodes of the previous childs are the same in old and in the partially patched node."""
+    # Position of the first node of every old child in the node's child nodes
+    positions = [0]
+    for child in old:
+        positions.append(positions[-1] + child.nodes)
+    items = []
+    for op, old_start, old_end, new_start, new_end in reversed(_childs_opcodes(old, new)):
+        if op == "equal":
+            continue
+        paired = min(old_end - old_start, new_end - new_start)
+        for index in range(old_end - 1, old_start + paired - 1, -1):
+            items.extend(Patch(REMOVE, path, index=positions[index]) for _ in range(old[index].nodes))
+        position = positions[old_start + paired]
+        for child in new[new_start + paired:new_end]:
+            items.append(Patch(INSERT, path, index=position, html=child.html))
+            position += child.nodes
+        items.extend(
+            (old[old_start + offset], new[new_start + offset], path + (positions[old_start + offset], ))
+            for offset in range(paired - 1, -1, -1)
+        )
+    return items
+
+
+def _childs_opcodes(old, new):
+    """Returns the difflib opcodes transforming the old childs in the new ones.
+    Childs lists of the same length with only some childs changed in place (the common case for live views)
+    are compared position by position, the others with difflib.SequenceMatcher."""
+    if len(old) == len(new):
+        changed = [index for index in range(len(old)) if old[index].html != new[index].html]
+        if len(changed) * 2 <= len(old):
+            return [("replace", index, index + 1, index, index + 1) for index in changed]
+    matcher = SequenceMatcher(None, [child.html for child in old], [child.html for child in new], autojunk=False)
+    return matcher.get_opcodes()
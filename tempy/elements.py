@@ -9,32 +9,73 @@ except ImportError:
     from collections.abc import Mapping
 
 from .bases import TempyClass
-from .tempy import DOMElement
+from .tempy import DOMElement, Escaped
+from .renderer import child_dispatch, SPLIT, ELEMENT, OBJECT
+from .index import TreeIndex
 from .exceptions import WrongContentError, TagError
 
 
+class TagAttrs(dict):
+    """Attributes of a Tag.
+    The style dict and the klass set are created only when first used."""
+
+    __slots__ = ()
+
+    def __missing__(self, key):
+        if key == "style":
+            value = self[key] = {}
+        elif key == "klass":
+            value = self[key] = set()
+        else:
+            raise KeyError(key)
+        return value
+
+    def __copy__(self):
+        return self.__class__(self)
+
+
 class Tag(DOMElement):
     """
     Provides an api for tag inner manipulation and for rendering.
     """
-    _template = "%s<%s%s>%s%s</%s>"
+    __slots__ = ("attrs", )
+
     _void = False
+    # Tag name resolved from the _<ClassName>__tag attributes, stored in every class on first use (see _class_tag)
+    _tag_name = None
+
+    @classmethod
+    def _class_tag(cls):
+        """Returns the tag name of this class, resolving it through the mro the first time."""
+        try:
+            return cls.__dict__["_tag_name"]
+        except KeyError:
+            pass
+        cls._tag_name = None
+        for klass in cls.__mro__:
+            try:
+                cls._tag_name = getattr(cls, "_%s__tag" % klass.__name__)
+                break
+            except AttributeError:
+                pass
+        return cls._tag_name
 
     def __init__(self, *args, **kwargs):
         data = kwargs.pop("data", {})
-        self.attrs = {"style": {}, "klass": set()}
+        self.attrs = TagAttrs()
+        # Attributes are set before DOMElement.__init__: the element isn't cached, nor in any tree yet
+        self._html_cache = None
+        self.parent = None
+        self._tree_index = None
         if args or kwargs:
             self.attr(*args, **kwargs)
         super().__init__(**data)
-        self._tab_count = 0
 
     def _get__tag(self):
-        for cls in self.__class__.__mro__:
-            try:
-                return getattr(self, "_%s__tag" % cls.__name__)
-            except AttributeError:
-                pass
-        raise TagError(self, "_*__tag not defined for this class or bases.")
+        tag_name = self._class_tag()
+        if tag_name is None:
+            raise TagError(self, "_*__tag not defined for this class or bases.")
+        return tag_name
 
     def __repr__(self):
         css_repr = "%s%s" % (
@@ -45,11 +86,22 @@ class Tag(DOMElement):
         )
         return super().__repr__()[:-1] + "%s>" % css_repr
 
-    def __copy__(self):
-        new = super().__copy__()
-        new.attrs = copy(self.attrs)
+    def _shallow_copy(self):
+        new = super()._shallow_copy()
+        attrs = new.attrs = TagAttrs(self.attrs)
+        for key in self._MAPPING_ATTRS + self._SET_VALUES_ATTRS:
+            if key in attrs:
+                attrs[key] = attrs[key].copy()
         return new
 
+    def _attrs_changed(self):
+        """Updates the rendering cache and the tree index after an attributes change."""
+        self._invalidate_html()
+        if TreeIndex.active:
+            index = self._get_tree_index()
+            if index is not None:
+                index.update(self)
+
     def attr(self, *args, **kwargs):
         """Add an attribute to the element"""
         for key, value in kwargs.items():
@@ -64,15 +116,18 @@ class Tag(DOMElement):
                 self.attrs[key] = value
         for arg in args:
             self.attrs[arg] = bool
+        self._attrs_changed()
         return self
 
     def remove_attr(self, attr):
         """Removes an attribute."""
         self.attrs.pop(attr, None)
+        self._attrs_changed()
         return self
 
     def set_id(self, css_id):
         self.attrs["id"] = css_id
+        self._attrs_changed()
         return self
 
     def id(self):
@@ -85,12 +140,14 @@ class Tag(DOMElement):
 
     def has_class(self, csscl):
         """Checks if this element have the given css class."""
-        return csscl in self.attrs["klass"]
+        return csscl in self.attrs.get("klass", ())
 
     def toggle_class(self, csscl):
         """Same as jQuery's toggleClass function. It toggles the css class on this element."""
         action = ("add", "remove")[self.has_class(csscl)]
-        return getattr(self.attrs["klass"], action)(csscl)
+        result = getattr(self.attrs["klass"], action)(csscl)
+        self._attrs_changed()
+        return result
 
     def add_class(self, cssclass):
         """Adds a css class to this element."""
@@ -120,6 +177,7 @@ class Tag(DOMElement):
     def hide(self):
         """Adds the "display: none" style attribute."""
         self.attrs["style"]["display"] = "none"
+        self._invalidate_html()
         return self
 
     def show(self, display=None):
@@ -129,6 +187,7 @@ class Tag(DOMElement):
             self.attrs["style"].pop("display")
         else:
             self.attrs["style"]["display"] = display
+        self._invalidate_html()
         return self
 
     def toggle(self):
@@ -141,58 +200,79 @@ class Tag(DOMElement):
 
     def text(self):
         """Renders the contents inside this element, without html tags."""
-        texts = []
-        for child in self.childs:
-            if isinstance(child, Tag):
-                texts.append(child.text())
-            elif hasattr(child, "render"):
-                texts.append(child.render())
+        # Postorder walk with an explicit stack: every Tag text joins its childs texts
+        stack = []
+        for node, entering in self._traverse(expand=_text_walked):
+            if entering:
+                stack.append((node, []))
+                continue
+            if entering is False:
+                text = " ".join(stack.pop()[1])
+                if not stack:
+                    return text
             else:
-                texts.append(child)
-        return " ".join(texts)
+                kind, _ = child_dispatch(node)
+                if kind == SPLIT or kind == ELEMENT:
+                    text = node.render()
+                elif kind == OBJECT:
+                    text = stack[-1][0]._render_object(node)
+                elif isinstance(node, Escaped):
+                    text = node.render
+                else:
+                    text = str(node)
+            stack[-1][1].append(text)
 
     def render(self, *args, **kwargs):
         """Renders the element and all his childrens."""
-        # args kwargs API provided for last minute content injection
-        # self._reverse_mro_func('pre_render')
         pretty = kwargs.pop("pretty", False)
-        for arg in args:
-            if isinstance(arg, dict):
-                self.inject(arg)
-        if kwargs:
-            self.inject(kwargs)
+        with self._render_context(args, kwargs):
+            return "".join(self._iter_split_parts(pretty=pretty))
+
+    def _splittable(self):
+        return self.__class__.render is Tag.render
 
+    def _render_split(self, pretty=False):
         pretty_pre = pretty_inner = ""
         if pretty:
-            pretty_pre = "\n" + ("\t" * self._depth) if pretty else ""
+            pretty_pre = "\n" + ("\t" * self._depth)
             pretty_inner = "\n" + ("\t" * self._depth) if len(self.childs) > 1 else ""
-        inner = self.render_childs(pretty) if not self._void else ""
-
-        tag_data = (
-            pretty_pre,
-            self._get__tag(),
-            self.render_attrs(),
-            inner,
-            pretty_inner,
-            self._get__tag()
-        )[: 6 - [0, 3][self._void]]
-        return self._template % tag_data
+        tag = self._get__tag()
+        if self._void:
+            return "%s<%s%s/>" % (pretty_pre, tag, self.render_attrs()), ""
+        return "%s<%s%s>" % (pretty_pre, tag, self.render_attrs()), "%s</%s>" % (pretty_inner, tag)
 
     def apply_function(self, format_function):
-        for (index, child) in enumerate(self.childs):
-            if child is not None:
-                if isinstance(child, TempyClass):
-                    child.apply_function(format_function)
-                else:
-                    self.childs[index] = format_function(self.childs[index])
+        # Walks the Tags using this apply_function, the other Tempy elements apply the function themselves.
+        # Every walked Tag formats its non Tempy childs after its descendants.
+        for node, entering in self._traverse(expand=_function_walked):
+            if entering is False:
+                childs = node.childs
+                for (index, child) in enumerate(childs):
+                    if child is not None and not isinstance(child, TempyClass):
+                        childs[index] = format_function(child)
+                node._invalidate_html()
+            elif entering is None and isinstance(node, TempyClass):
+                node.apply_function(format_function)
+
+
+def _text_walked(element):
+    return isinstance(element, Tag)
+
+
+def _function_walked(element):
+    return getattr(type(element), "apply_function", None) is Tag.apply_function
 
 
 class VoidTag(Tag):
     """
     A void tag, as described in W3C reference: https://www.w3.org/TR/html51/syntax.html#void-elements
     """
+    __slots__ = ()
+
     _void = True
-    _template = "%s<%s%s/>"
 
     def _insert(self, dom_group, idx=None, prepend=False, name=None):
         raise TagError(self, "Adding elements to a Void Tag is prohibited.")
+
+    def extend_children(self, childs):
+        raise TagError(self, "Adding elements to a Void Tag is prohibited.")
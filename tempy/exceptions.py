@@ -70,3 +70,7 @@ class AttrNotFoundError(TempyException):
 
 class ElementNotFoundError(TempyException):
     """Raised when DOMElement is not found in find method"""
+
+
+class SelectorError(TempyException, ValueError):
+    """Raised when a css selector can't be parsed"""
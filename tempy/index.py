@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Lookup tables of the elements of a Tempy tree, used by DOMNavigator.find.
+An index is built on a root element with DOMNavigator.build_index and kept up to date
+by the DOMModifier methods and by the Tag attributes methods."""
+from weakref import WeakSet
+
+from .bases import TempyClass, tag_name_of
+
+
+class TreeIndex:
+    """Elements of a tree by css id, css class, element class and name.
+    Every element is indexed by the keys it had when last (re)indexed, so it can be removed
+    from the tables even after its attributes changed."""
+
+    # Indexes in use: when empty the modifier methods skip the index lookup.
+    # Indexes of garbage collected trees leave the set even if never dropped
+    active = WeakSet()
+
+    __slots__ = ("root", "ids", "classes", "types", "names", "_keys", "__weakref__")
+
+    def __init__(self, root):
+        self.root = root
+        self.ids = {}
+        self.classes = {}
+        self.types = {}
+        self.names = {}
+        self._keys = {}
+        self.add(root)
+
+    @staticmethod
+    def _subtree(element):
+        stack = [element]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, TempyClass):
+                yield node
+                stack.extend(node.childs)
+
+    @staticmethod
+    def _node_keys(node):
+        attrs = getattr(node, "attrs", None) or {}
+        css_id = attrs.get("id")
+        return None if css_id is None else str(css_id), tuple(attrs.get("klass", ())), node.__class__, node._name
+
+    def _add_node(self, node):
+        keys = self._keys[node] = self._node_keys(node)
+        css_id, css_classes, typ, name = keys
+        if css_id is not None:
+            self.ids.setdefault(css_id, set()).add(node)
+        for css_class in css_classes:
+            self.classes.setdefault(css_class, set()).add(node)
+        self.types.setdefault(typ, set()).add(node)
+        if name is not None:
+            self.names.setdefault(name, set()).add(node)
+
+    def _discard_node(self, node):
+        keys = self._keys.pop(node, None)
+        if keys is None:
+            return
+        css_id, css_classes, typ, name = keys
+        for table, key in ((self.ids, css_id), (self.types, typ), (self.names, name)):
+            self._discard_from(table, key, node)
+        for css_class in css_classes:
+            self._discard_from(self.classes, css_class, node)
+
+    @staticmethod
+    def _discard_from(table, key, node):
+        group = table.get(key)
+        if group is not None:
+            group.discard(node)
+            if not group:
+                del table[key]
+
+    def add(self, element):
+        """Indexes the element and all its descendants."""
+        for node in self._subtree(element):
+            self._add_node(node)
+
+    def discard(self, element):
+        """Removes the element and all its descendants from the index."""
+        for node in self._subtree(element):
+            self._discard_node(node)
+
+    def update(self, node):
+        """Indexes again a single element after its attributes or name changed."""
+        self._discard_node(node)
+        self._add_node(node)
+
+    def elements(self):
+        return set(self._keys)
+
+    def by_type(self, cls):
+        """Elements instances of the given class."""
+        return set().union(*(group for typ, group in self.types.items() if issubclass(typ, cls)))
+
+    def by_tag(self, name):
+        """Elements with the given tag name (case insensitive) or class name, see selectors.Compound."""
+        tag = name.lower()
+        return set().union(
+            *(group for typ, group in self.types.items() if name == typ.__name__ or tag == tag_name_of(typ))
+        )
+
+    def by_name(self, name):
+        return set(self.names.get(name, ()))
+
+    def by_id(self, css_id):
+        return set(self.ids.get(css_id, ()))
+
+    def by_class(self, css_class):
+        return set(self.classes.get(css_class, ()))
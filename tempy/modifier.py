@@ -5,14 +5,33 @@ try:
     from collections import Iterable
 except ImportError:
     from collections.abc import Iterable
-from copy import copy
 
 from .bases import TempyClass
+from .index import TreeIndex
 from .tools import content_receiver
 from .exceptions import TagError, WrongArgsError, DOMModByKeyError, DOMModByIndexError
 
 
+# Max number of childs shifting operations logged by every element, see BaseDOMModifier._shift_childs
+INDEX_LOG_SIZE = 64
+
+
 class BaseDOMModifier(TempyClass):
+    __slots__ = ()
+
+    def _shift_childs(self, position=None, delta=0):
+        """Logs that the childs from the given position on moved by delta,
+        this log is used to keep the positions stored in the childs valid (see DOMElement._own_index).
+        If no position is given the positions of all the childs are considered lost."""
+        self._index_ops += 1
+        log = self._index_log
+        if position is None:
+            self._index_log = []
+            return
+        if log is None or len(log) >= INDEX_LOG_SIZE:
+            log = self._index_log = []
+        log.append((position, delta))
+
     def _insert(self, dom_group, idx=None, prepend=False, name=None):
         """Inserts a DOMGroup inside this element.
         If provided at the given index, if prepend at the start of the childs list, by default at the end.
@@ -33,14 +52,25 @@ class BaseDOMModifier(TempyClass):
             if elem is not None:
                 # Element insertion in this DOMElement childs
                 if idx == -1:
+                    position = len(self.childs)
                     self.childs.append(elem)
                 else:
-                    self.childs.insert(idx + i_group, elem)
+                    position = min(idx + i_group, len(self.childs))
+                    if position < len(self.childs):
+                        self._shift_childs(position, 1)
+                    self.childs.insert(position, elem)
                 # Managing child attributes if needed
                 if hasattr(elem, "parent"):
                     elem.parent = self
+                    if isinstance(elem, TempyClass):
+                        elem._parent_changed()
+                        elem._child_index = position
+                        elem._child_stamp = self._index_ops
+                        if TreeIndex.active:
+                            self._index_inserted(elem)
                 if name:
-                    setattr(self, name, elem)
+                    self._set_named_child(name, elem)
+        self._invalidate_html()
 
     @content_receiver()
     def __call__(self, _, child, name=None):
@@ -48,11 +78,19 @@ class BaseDOMModifier(TempyClass):
         self._insert(child, name=name)
 
     def clone(self):
-        """Returns a deepcopy of this element."""
-        return copy(self)
+        """Returns a deep copy of this element: Tempy childs, named childs, content data and attributes
+        are copied, other childs (strings, objects) are shared. The tree is copied iteratively."""
+        new = self._shallow_copy()
+        stack = [(self, new)]
+        while stack:
+            source, target = stack.pop()
+            stack.extend(target._adopt_copies(source))
+        return new
 
 
 class SiblingsManager(BaseDOMModifier):
+    __slots__ = ()
+
     @content_receiver()
     def after(self, i, sibling, name=None):
         """Adds siblings after the current tag."""
@@ -67,6 +105,8 @@ class SiblingsManager(BaseDOMModifier):
 
 
 class DOMNihil(SiblingsManager):
+    __slots__ = ()
+
     def replace_with(self, other):
         """Replace this element with the given DOMElement."""
         self.after(other)
@@ -86,8 +126,13 @@ class DOMNihil(SiblingsManager):
         removed = self.childs[idx_from:idx_to]
         for child in removed:
             if issubclass(child.__class__, TempyClass):
+                if TreeIndex.active:
+                    self._index_removed(child)
                 child.parent = None
+                child._parent_changed()
         self.childs[idx_from:idx_to] = []
+        self._shift_childs(idx_to, idx_from - idx_to)
+        self._invalidate_html()
         return removed
 
     def move_childs(self, new_father, idx_from=None, idx_to=None):
@@ -111,8 +156,12 @@ class DOMNihil(SiblingsManager):
                 result = self.childs.pop(arg)
             except IndexError:
                 raise DOMModByIndexError(self, "Given index invalid.")
+            self._shift_childs(arg % (len(self.childs) + 1) + 1, -1)
             if isinstance(result, TempyClass):
+                if TreeIndex.active:
+                    self._index_removed(result)
                 result.parent = None
+                result._parent_changed()
         else:
             result = []
             if isinstance(arg, str):
@@ -125,7 +174,12 @@ class DOMNihil(SiblingsManager):
             for x in result:
                 self.childs.remove(x)
                 if isinstance(x, TempyClass):
+                    if TreeIndex.active:
+                        self._index_removed(x)
                     x.parent = False
+                    x._parent_changed()
+            self._shift_childs()
+        self._invalidate_html()
         return result
 
     def empty(self):
@@ -135,6 +189,8 @@ class DOMNihil(SiblingsManager):
 
 
 class OperatorsModifier(DOMNihil):
+    __slots__ = ()
+
     def __add__(self, other):
         """Addition produces a copy of the left operator, containig the right operator as a child."""
         return self.clone()(other)
@@ -176,6 +232,8 @@ class OperatorsModifier(DOMNihil):
 
 
 class DOMFather(OperatorsModifier):
+    __slots__ = ()
+
     @content_receiver(reverse=True)
     def prepend(self, _, child, name=None):
         """Adds childs to this tag, starting from the first position."""
@@ -198,8 +256,33 @@ class DOMFather(OperatorsModifier):
         father.append(self)
         return self
 
+    def extend_children(self, childs):
+        """Adds all the given childs after the current existing childs, in one pass.
+        Fast path for already built childs: unlike append, iterables are not flattened and childs can't be named,
+        None childs are skipped."""
+        own_childs = self.childs
+        position = len(own_childs)
+        stamp = self._index_ops
+        append = own_childs.append
+        for child in childs:
+            if child is None:
+                continue
+            append(child)
+            if isinstance(child, TempyClass):
+                child.parent = self
+                child._parent_changed()
+                child._child_index = position
+                child._child_stamp = stamp
+                if TreeIndex.active:
+                    self._index_inserted(child)
+            position += 1
+        self._invalidate_html()
+        return self
+
 
 class DOMWrapper(DOMFather):
+    __slots__ = ()
+
     def wrap(self, other):
         """Wraps this element inside another empty tag."""
         if other.childs:
@@ -230,7 +313,7 @@ class DOMWrapper(DOMFather):
 
         def wrap_next(tag, idx):
             nonlocal wcopies, failures
-            next_copy = self.__copy__()
+            next_copy = self.clone()
             try:
                 return next_copy.wrap(tag)
             except TagError:
@@ -258,4 +341,4 @@ class DOMWrapper(DOMFather):
 
 
 class DOMModifier(DOMWrapper):
-    pass
+    __slots__ = ()
@@ -4,24 +4,77 @@
 import inspect
 from collections import deque
 from .bases import TempyClass
+from .context import current_bindings
+from .index import TreeIndex
+from .selectors import Selector, compile_selector
+from .diff import snapshot as take_snapshot, diff as tree_diff
+
+# Incremented when an element with a cached ancestry changes parent: older ancestries are stale
+_ancestry_version = 0
 
 
 class DOMNavigator(TempyClass):
+    __slots__ = ()
+
+    def _ancestry(self):
+        """Returns (version, root, depth) of this element. Ancestries are cached on the elements
+        and computed climbing only to the nearest ancestor with a valid cached ancestry."""
+        version = _ancestry_version
+        ancestry = self._ancestry_cache
+        if ancestry is not None and ancestry[0] == version:
+            return ancestry
+        chain = []
+        node = self
+        while node:
+            ancestry = node._ancestry_cache
+            if ancestry is not None and ancestry[0] == version:
+                _, root, depth = ancestry
+                break
+            chain.append(node)
+            node = node.parent
+        else:
+            root, depth = chain[-1], -1
+        for node in reversed(chain):
+            depth += 1
+            node._ancestry_cache = (version, root, depth)
+        return self._ancestry_cache
+
+    def _parent_changed(self):
+        """To be called after this element's parent changed, makes the cached ancestries stale.
+        Elements without a cached ancestry have no descendants with one, and need no invalidation."""
+        if self._ancestry_cache is not None:
+            global _ancestry_version
+            _ancestry_version += 1
+
     @property
     def root(self):
-        return self.parent.root if self.parent else self
+        return self._ancestry()[1]
+
+    @property
+    def _depth(self):
+        return self._ancestry()[2]
+
+    @property
+    def is_root(self):
+        return not self.parent
 
     def find_content(self, cont_name):
-        """Search for a content_name in the content data, if not found the parent is searched."""
-        try:
-            a = self.content_data[cont_name]
-            return a
-        except KeyError:
-            if self.parent:
-                return self.parent.find_content(cont_name)
-            else:
-                # Fallback for no content (Raise NoContent?)
-                return ""
+        """Search for a content_name in the content data, if not found the parent is searched.
+        Content data bound to an element by the current render (see tempy.context) takes precedence
+        over the element's own content data."""
+        bindings = current_bindings()
+        node = self
+        while node:
+            if bindings:
+                bound = bindings.get(id(node))
+                if bound and cont_name in bound:
+                    return bound[cont_name]
+            try:
+                return node.content_data[cont_name]
+            except KeyError:
+                node = node.parent
+        # Fallback for no content (Raise NoContent?)
+        return ""
 
     def _get_non_tempy_contents(self):
         """Returns rendered Contents and non-DOMElement stuff inside this Tag."""
@@ -34,15 +87,11 @@ class DOMNavigator(TempyClass):
     def _match_selector(el, selector):
         if not selector:
             return True
-        if inspect.isclass(selector) and isinstance(el, selector):
-            return True
-        elif isinstance(selector, str) and (
-            (
-                inspect.isclass(el) and selector == el.__name__
-            ) or selector == el.__class__.__name__
-        ):
-            return True
-        return False
+        if inspect.isclass(selector):
+            return isinstance(el, selector)
+        if isinstance(selector, str):
+            selector = compile_selector(selector)
+        return selector.match(el)
 
     @staticmethod
     def _match_name(el, name):
@@ -50,25 +99,109 @@ class DOMNavigator(TempyClass):
             return True
         return name is not None and hasattr(el, "_name") and name == el._name
 
+    def build_index(self):
+        """Indexes the tree of this element by css id, css class, element class and name.
+        find will use the index when the given selector allows it; the index is kept up to date by the Tempy
+        modification methods (direct modifications of the childs list or of the attrs dict are not tracked).
+        The index is kept by the tree root, it's dropped if the root is inserted in another tree."""
+        root = self.root
+        if root._tree_index is None:
+            root._tree_index = TreeIndex(root)
+            TreeIndex.active.add(root._tree_index)
+        return self
+
+    def drop_index(self):
+        """Removes the index of this element's tree, see build_index."""
+        self.root._drop_tree_index()
+        return self
+
+    def _drop_tree_index(self):
+        if self._tree_index is not None:
+            TreeIndex.active.discard(self._tree_index)
+            self._tree_index = None
+
+    def _get_tree_index(self):
+        """Returns the index of the tree this element is part of, if any."""
+        node = self
+        parent = node.parent
+        while parent:
+            if node._child_index < 0:
+                # Elements adopted without being inserted (TempyREPR views) are not part of the tree
+                return None
+            node = parent
+            parent = node.parent
+        return node._tree_index
+
+    def _index_inserted(self, child):
+        """Adds a child just inserted in this element to the tree index, if any."""
+        # A tree inserted in another one loses its own index
+        child._drop_tree_index()
+        index = self._get_tree_index()
+        if index is not None:
+            index.add(child)
+
+    def _index_removed(self, child):
+        """Removes a child just removed from this element from the tree index, if any."""
+        index = self._get_tree_index()
+        if index is not None:
+            index.discard(child)
+
+    def _is_descendant_of(self, ancestor):
+        node = self.parent
+        while node:
+            if node is ancestor:
+                return True
+            node = node.parent
+        return False
+
+    def _find_indexed(self, index, selector, names):
+        """find using the tree index, returns None if the selector doesn't allow it."""
+        if names:
+            found = index.by_name(names)
+            if isinstance(selector, Selector):
+                found = selector.select(found)
+            elif selector:
+                found = {el for el in found if self._match_selector(el, selector)}
+        elif isinstance(selector, Selector):
+            found = selector.select(selector.candidates(index))
+        elif inspect.isclass(selector) and issubclass(selector, TempyClass):
+            found = index.by_type(selector)
+        else:
+            return None
+        if self is index.root:
+            found.discard(self)
+            return found
+        return {el for el in found if el._is_descendant_of(self)}
+
+    def _descendants(self):
+        """Yields all the childs of this element and of its descendants, Tempy elements or not, in preorder."""
+        for node, entering in self._traverse():
+            if entering is not False and node is not self:
+                yield node
+
     def find(self, selector=None, names=None):
         """
         @param:
-            selector => css selector / given as list (returns matching elements)
-                        or TempyClass name (returns instances of this class)
+            selector => css selector (see tempy.selectors) or list of css selectors (returns matching elements),
+                        or TempyClass (returns instances of this class)
             names => returns attributes of elements with given name
+        Css type selectors match both the tag name and the Tempy class name: find('Pre'), find('pre > a.link').
+        If the tree is indexed (see build_index) the index is used when possible.
         """
-        found_elements = set()
-        for child in self.childs:
-            match_selector = self._match_selector(child, selector)
-            match_name = self._match_name(child, names)
-
-            if match_name and match_selector:
-                found_elements.add(child)
-
-            if issubclass(child.__class__, TempyClass) and child.childs:
-                found_elements |= child.find(selector, names)
-
-        return found_elements
+        if isinstance(selector, (list, tuple)):
+            selector = ", ".join(selector)
+        if isinstance(selector, str):
+            selector = compile_selector(selector)
+        if TreeIndex.active and (selector or names):
+            index = self._get_tree_index()
+            if index is not None:
+                found = self._find_indexed(index, selector, names)
+                if found is not None:
+                    return found
+        found = (child for child in self._descendants() if self._match_name(child, names))
+        if isinstance(selector, Selector):
+            return selector.select(found)
+        return {child for child in found if self._match_selector(child, selector)}
 
     def children(self):
         """Returns Tags and Content Placehorlders childs of this element."""
@@ -114,6 +247,16 @@ class DOMNavigator(TempyClass):
         """Slice of this element's childs as childs[start:end:step]"""
         return self.childs[start:end:step]
 
+    def snapshot(self, *args, **kwargs):
+        """Returns a record of this element's markup to be compared with later versions of the tree (see diff).
+        Same api as render for last minute content injection."""
+        return take_snapshot(self, *args, **kwargs)
+
+    def diff(self, old):
+        """Returns the patch operations transforming the markup of old (an element or a snapshot)
+        in the markup of this element, see tempy.diff."""
+        return tree_diff(old, self)
+
     def bft(self):
         """ Generator that returns each element of the tree in Breadth-first order"""
         queue = deque([self])
@@ -123,16 +266,37 @@ class DOMNavigator(TempyClass):
             if hasattr(node, "childs"):
                 queue.extendleft(node.childs)
 
+    def _traverse(self, reverse=False, expand=None):
+        """Depth-first traversal engine of the tree walks, with an explicit stack:
+        deep trees don't hit the recursion limit.
+        Yields (node, entering) couples: Tempy elements are yielded with entering True before their descendants
+        and with entering False after them, every other child is yielded once with entering None.
+        Keyword arguments:
+        reverse -- if true, the childs are walked from right to left.
+        expand -- predicate on the descendant elements: elements for which it's false are not walked,
+                  they're yielded once with entering None. This element is always walked.
+        """
+        yield self, True
+        stack = [(self, iter(reversed(self.childs) if reverse else self.childs))]
+        while stack:
+            node, childs = stack[-1]
+            for child in childs:
+                if isinstance(child, TempyClass) and (expand is None or expand(child)):
+                    yield child, True
+                    stack.append((child, iter(reversed(child.childs) if reverse else child.childs)))
+                    break
+                yield child, None
+            else:
+                stack.pop()
+                yield node, False
+
     def dfs_preorder(self, reverse=False):
         """Generator that returns each element of the tree in Preorder order.
         Keyword arguments:
         reverse -- if true, the search is done from right to left."""
-        stack = deque()
-        stack.append(self)
-        while stack:
-            node = stack.pop()
-            yield node
-            _, stack = self.__visit_node(node, stack, reverse)
+        for node, entering in self._traverse(reverse):
+            if entering is not False:
+                yield node
 
     def dfs_inorder(self, reverse=False):
         """Generator that returns each element of the tree in Inorder order.
@@ -160,15 +324,9 @@ class DOMNavigator(TempyClass):
         """Generator that returns each element of the tree in Postorder order.
         Keyword arguments:
         reverse -- if true, the search is done from right to left."""
-        stack = deque()
-        stack.append(self)
-        visited = set()
-        while stack:
-            node = stack.pop()
-            if node in visited:
+        for node, entering in self._traverse(reverse):
+            if entering is not True:
                 yield node
-            else:
-                visited, stack = self.__visit_node(node, stack, reverse, visited)
 
     @staticmethod
     def __visit_node(node, stack, reverse, visited=None):
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Parallel rendering: the childs of the elements with large childs lists are split in chunks,
+rendered in worker processes and joined in order with the markup rendered in the main process.
+Usage:
+    ParallelRenderer(workers=4, threshold=500).render(page, title="Hello")
+
+Workers are forked when the render starts and inherit the tree: only the chunks positions and the rendered
+markup are pickled, pickling Tempy elements would cost more than rendering them.
+Every render forks its own workers: meant for batch jobs and scripts rendering huge documents,
+forking a multi-threaded process (i.e. a threaded web server) is unsafe.
+"""
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .bases import TempyClass
+from .context import BindingsContext, current_bindings
+
+# Minimum number of childs of an element for its childs to be rendered in parallel
+DEFAULT_THRESHOLD = 1000
+
+# Tree rendered by the worker process and the render bindings, set by _init_worker
+_worker_tree = None
+
+
+def _fork_context():
+    """Multiprocessing context used to start the workers, None if processes can't be forked on this platform
+    (or if ProcessPoolExecutor can't use it, before Python 3.7)."""
+    if sys.version_info < (3, 7):
+        return None
+    try:
+        return multiprocessing.get_context("fork")
+    except ValueError:
+        return None
+
+
+def _init_worker(element, bindings):
+    global _worker_tree
+    _worker_tree = element, bindings
+
+
+def _render_chunk(path, start, stop):
+    """Worker side: renders the childs[start:stop] of the element found following the path of childs positions."""
+    element, bindings = _worker_tree
+    for position in path:
+        element = element.childs[position]
+    with BindingsContext(bindings):
+        return "".join(element._render_child(child) for child in element.childs[start:stop])
+
+
+class ParallelRenderer:
+    """Renders Tempy trees using worker processes.
+    The childs of every element with at least threshold childs are split in chunks of chunk_size childs
+    (by default, two chunks per worker) and rendered by the workers, the rest of the tree is rendered in the
+    main process while the workers are running.
+    Pretty renders, trees without large childs lists and platforms that can't fork processes are rendered serially.
+    Elements with a custom render method are rendered as a whole, with their childs.
+    """
+
+    def __init__(self, workers=None, threshold=DEFAULT_THRESHOLD, chunk_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+
+    def _targets(self, element):
+        """Returns the elements whose childs are rendered in parallel, mapped by id to their path from the element,
+        and the ids of their ancestors. Only the subtrees walked by the serial render are searched,
+        static subtrees with cached markup are skipped."""
+        targets, ancestors = {}, set()
+        stack = [(element, ())]
+        while stack:
+            node, path = stack.pop()
+            if len(node.childs) >= self.threshold:
+                targets[id(node)] = path
+                while node is not element:
+                    node = node.parent
+                    if id(node) in ancestors:
+                        break
+                    ancestors.add(id(node))
+                continue
+            for position in range(len(node.childs) - 1, -1, -1):
+                child = node.childs[position]
+                if isinstance(child, TempyClass) and child._splittable() and not isinstance(child._html_cache, str):
+                    stack.append((child, path + (position, )))
+        return targets, ancestors
+
+    def _submit(self, executor, element, targets):
+        """Sends the chunks of the targets' childs to the workers, returns the futures mapped by target id."""
+        chunks = {}
+        for path in targets.values():
+            target = element
+            for position in path:
+                target = target.childs[position]
+            count = len(target.childs)
+            size = self.chunk_size or -(-count // (self.workers * 2))
+            chunks[id(target)] = [
+                executor.submit(_render_chunk, path, start, min(start + size, count)) for start in range(0, count, size)
+            ]
+        return chunks
+
+    def _iter_parts(self, element, chunks, ancestors):
+        """Yields the markup of an element containing parallel rendered childs."""
+        opening, closing = element._render_split()
+        yield opening
+        if id(element) in chunks:
+            for future in chunks[id(element)]:
+                yield future.result()
+        else:
+            for child in element.childs:
+                if isinstance(child, TempyClass) and (id(child) in chunks or id(child) in ancestors):
+                    yield from self._iter_parts(child, chunks, ancestors)
+                else:
+                    yield element._render_child(child)
+        yield closing
+
+    def render(self, element, *args, **kwargs):
+        """Renders the element, same api as Tag.render."""
+        pretty = kwargs.pop("pretty", False)
+        context = _fork_context()
+        if pretty or context is None or not element._splittable():
+            return element.render(*args, pretty=pretty, **kwargs)
+        with element._render_context(args, kwargs):
+            targets, ancestors = self._targets(element)
+            if not targets:
+                return "".join(element._iter_render_parts())
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=_init_worker, initargs=(element, current_bindings()),
+            ) as executor:
+                chunks = self._submit(executor, element, targets)
+                try:
+                    return "".join(self._iter_parts(element, chunks, ancestors))
+                finally:
+                    for futures in chunks.values():
+                        for future in futures:
+                            future.cancel()
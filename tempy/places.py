@@ -5,12 +5,13 @@ Places used by Tempy to choose the right TempyREPR to use.
 Magically created starting from the tags module.
 """
 import importlib
-from .tempyrepr import TempyPlace
+from .tempyrepr import TempyPlace, positional_scorer
 
 
 class Inside(TempyPlace):
     """Check if a TempyREPR object's container is inside a certain Tempy Tag"""
 
+    @positional_scorer
     def _reprscore_container_parent(self, container, child):
         if container.parent.__class__ == self._pointer_class:
             return 1
@@ -33,6 +34,7 @@ class Sibling(TempyPlace):
 class Near(Sibling):
     """Check if a TempyREPR object's container if near a certain Tempy Tag"""
 
+    @positional_scorer
     def _reprscore_container_siblings(self, container, child):
         return self._check_container_siblings(container)
 
@@ -40,6 +42,7 @@ class Near(Sibling):
 class Before(Sibling):
     """Check if a TempyREPR object's container if before a certain Tempy Tag"""
 
+    @positional_scorer
     def _reprscore_container_following(self, container, child):
         return self._check_container_siblings(container, start=0)
 
@@ -47,6 +50,7 @@ class Before(Sibling):
 class After(Sibling):
     """Check if a TempyREPR object's container if after a certain Tempy Tag"""
 
+    @positional_scorer
     def _reprscore_container_previous(self, container, child):
         return self._check_container_siblings(container, stop=0)
 
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Copy-on-navigation instances of a layout, to build per-request page variants without cloning the whole tree.
+Usage:
+    base = Prototype(layout)
+    page = base.instance()
+    page.body.main(Div()("Hello"))
+    page.render(user=user)
+
+The Prototype keeps its own copy of the layout: later modifications of the layout (or of the instances)
+never reach the instances. An instance copies the dynamic parts of the layout (Content placeholders,
+objects, elements with a custom rendering and their ancestors), so everything resolved through the tree
+at render time is resolved through the instance. Static subtrees are shared: an instance element sharing
+its prototype's childs leaves its childs slot unset, the first access to its childs (or to a named child)
+copies them one level down (see DOMElement._materialize). Static markup doesn't depend on the tree around it,
+so rendering copies nothing; pretty rendering copies the subtrees it walks.
+"""
+from .renderer import child_dispatch, LEAF, SPLIT, _escape_object
+
+
+class Prototype:
+    """Copy of a Tempy tree making instances of it in a time proportional to its dynamic parts."""
+
+    def __init__(self, tree):
+        self.tree = tree.clone()
+        self._mark_statics()
+
+    def __repr__(self):
+        return "<%s.%s of %r>" % (self.__module__, type(self).__name__, self.tree)
+
+    def _mark_statics(self):
+        """Marks every element of the copied tree as static or dynamic, as the render walk does
+        (see DOMRenderer._static_html). The copy is never modified: the marks are never dropped."""
+        statics = []
+        for node, entering in self.tree._traverse():
+            if entering:
+                kind, render = child_dispatch(node)
+                statics.append(kind == SPLIT and node._static_markup() or kind == LEAF)
+            elif entering is False:
+                static = node._html_cache = statics.pop()
+                if not static and statics:
+                    statics[-1] = False
+            else:
+                kind, render = child_dispatch(node)
+                if kind != LEAF or render is _escape_object:
+                    statics[-1] = False
+
+    def instance(self):
+        """Returns a new instance of the tree: dynamic elements are copied, static subtrees are shared
+        until they're navigated."""
+        tree = self.tree
+        new = tree._shallow_copy()
+        if tree._html_cache:
+            new._prototype = tree
+            return new
+        stack = [(tree, new)]
+        while stack:
+            source, target = stack.pop()
+            for child, child_copy in target._adopt_copies(source):
+                if child._html_cache:
+                    child_copy._prototype = child
+                else:
+                    stack.append((child, child_copy))
+        return new
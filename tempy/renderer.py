@@ -1,15 +1,24 @@
 # -*- coding: utf-8 -*-
 # @author: Federico Cerchiari <federicocerchiari@gmail.com>
 """Base class for rendering"""
+from io import RawIOBase, BufferedIOBase
 from html import escape
 from numbers import Number
 from functools import partial
+from weakref import WeakKeyDictionary, WeakSet
 
 from .bases import TempyClass
 from .tempyrepr import TempyPlace, TempyREPR
+from .context import RenderContext, NO_CONTEXT, isolated, content_scope
+
+DEFAULT_CHUNK_SIZE = 8192
 
 
 class DOMRenderer(TempyClass):
+	__slots__ = ()
+
+	# True for elements resolving their content from the render scope, see Content._iter_render_parts
+	_scoped = False
 
 	def __repr__(self):
 		return "<%s.%s %s.%s%s%s>" % (
@@ -22,32 +31,27 @@ class DOMRenderer(TempyClass):
 		)
 
 	def _render_tempy_repr(self, tempy_repr_cls, child, pretty=False):
-		class Patched(tempy_repr_cls, self.__class__):
-			def __init__(s, obj, *args, **kwargs):
-				# Forced adoption of the patched element as son of us
-				s.parent = self
-				# MRO would init only the tempyREPR_cls, we force DOMElement init too
-				self.__class__.__init__(s, **kwargs)
-				super().__init__(obj)
+		return _patched_class(tempy_repr_cls, self.__class__)(child, self).render(pretty=pretty)
+
+	def _render_child(self, child, pretty=False):
+		"""Renders a single child of this element using Tempy rules."""
+		kind, render = child_dispatch(child)
+		if kind == LEAF:
+			return render(child)
+		elif kind == OBJECT:
+			return self._render_object(child, pretty=pretty)
+		return child.render(pretty=pretty)
 
-		return Patched(child).render(pretty=pretty)
+	def _render_object(self, child, pretty=False):
+		"""Renders a non-Tempy child using the best TempyREPR found in the child's class."""
+		tempy_repr_cls = self._search_for_view(child)
+		if tempy_repr_cls:
+			return self._render_tempy_repr(tempy_repr_cls, child, pretty=pretty)
+		return escape(str(child))
 
 	def _iter_child_renders(self, pretty=False):
 		for child in self.childs:
-			if isinstance(child, str):
-				yield escape(child)
-			elif isinstance(child, Number):
-				yield str(child)
-			elif child.__class__.__name__ == "Escaped":
-				yield child.render
-			elif issubclass(child.__class__, TempyClass):
-				yield child.render(pretty=pretty)
-			elif not issubclass(child.__class__, TempyClass):
-				tempy_repr_cls = self._search_for_view(child)
-				if tempy_repr_cls:
-					yield self._render_tempy_repr(tempy_repr_cls, child, pretty=pretty)
-				else:
-					yield escape(str(child))
+			yield self._render_child(child, pretty=pretty)
 
 	@staticmethod
 	def _filter_classes(cls_list, cls_type):
@@ -71,35 +75,278 @@ class DOMRenderer(TempyClass):
 			score += 1
 
 		# Add points defined in scorers methods of used TempyPlaces
-		for parent_cls in self._filter_classes(repr_cls.__mro__[1:], TempyPlace):
-			for scorer in (
-					method for method in dir(parent_cls) if method.startswith("_reprscore")
-			):
-				score += getattr(parent_cls, scorer, lambda *args: 0)(
-					parent_cls, self, child
-				)
+		for place_cls, scorer in _repr_scorers(repr_cls):
+			score += scorer(place_cls, self, child)
 		return score
 
+	def _repr_position(self):
+		"""Signature of this element's position, as seen by the positional TempyPlace scorers:
+		classes of this element, of the tree root, of the parent and of the adjacent siblings.
+		Returns None if the position can't be determined."""
+		parent = self.parent
+		if not parent:
+			return self.__class__, self.__class__, None, None, None
+		index = self._own_index
+		if index < 0:
+			return None
+		siblings = parent.childs
+		return (
+			self.__class__,
+			self.root.__class__,
+			parent.__class__,
+			siblings[index - 1].__class__ if index > 0 else None,
+			siblings[index + 1].__class__ if index + 1 < len(siblings) else None,
+		)
+
 	def _search_for_view(self, obj):
 		"""Searches for TempyREPR class declarations in the child's class.
 		If at least one TempyREPR is found, it uses the best one to make a Tempy object.
 		Otherwise the original object is returned.
+		Resolutions are cached by object class and container position when all the scorers involved are positional.
 		"""
-		evaluator = partial(self._evaluate_tempy_repr, obj)
-		sorted_reprs = sorted(
-			self._filter_classes(obj.__class__.__dict__.values(), TempyREPR),
-			key=evaluator,
-			reverse=True,
-		)
-		if sorted_reprs:
-			# If we find some TempyREPR, we return the one with the best score.
-			return sorted_reprs[0]
-		return None
+		cls = obj.__class__
+		candidates, positional = _repr_candidates(cls)
+		if len(candidates) < 2:
+			return candidates[0] if candidates else None
+
+		key = None
+		if positional:
+			position = self._repr_position()
+			if position is not None:
+				key = (cls, position)
+				try:
+					return _REPR_RESOLUTIONS[key]
+				except KeyError:
+					pass
+		# If we find some TempyREPR, we return the one with the best score.
+		best = max(candidates, key=partial(self._evaluate_tempy_repr, obj))
+		if key is not None:
+			if len(_REPR_RESOLUTIONS) >= REPR_CACHE_SIZE:
+				_REPR_RESOLUTIONS.clear()
+			_REPR_RESOLUTIONS[key] = best
+		return best
 
 	def render(self, *args, **kwargs):
 		"""Placeholder for subclass implementation"""
 		raise NotImplementedError
 
+	def _splittable(self):
+		"""True if this element can be rendered as opening markup, childs and closing markup."""
+		return False
+
+	def _render_split(self, pretty=False):
+		"""Returns the (opening, closing) markup surrounding this element's childs."""
+		raise NotImplementedError
+
+	def _render_context(self, args, kwargs):
+		"""Render args and kwargs API provided for last minute content injection.
+		Returns a context manager binding the given contents to this element for the duration of the render,
+		the tree itself is not modified."""
+		data = {}
+		for arg in args:
+			if isinstance(arg, dict):
+				data.update(arg)
+		data.update(kwargs)
+		if not data:
+			return NO_CONTEXT
+		return RenderContext(self, data)
+
+	def _iter_render_parts(self, pretty=False):
+		"""Depth-first generator of this element's markup."""
+		if self._splittable():
+			yield from self._iter_split_parts(pretty=pretty)
+		else:
+			yield self.render(pretty=pretty)
+
+	def _iter_split_parts(self, pretty=False):
+		"""Yields this element's opening markup, childs and closing markup.
+		Static subtrees are served from their cached markup (see _static_html)."""
+		cache = self._html_cache
+		if cache and not pretty and (cache is not True or self._cache_markup):
+			yield cache if cache is not True else self._static_html()
+			return
+		yield from self._walk_split_parts(pretty=pretty)
+
+	def _walk_split_parts(self, pretty=False):
+		"""Splittable descendants are walked with an explicit stack, the others are rendered as a whole.
+		Every walked element is marked as static or dynamic: static elements keeping their markup
+		(see cache_markup) are rendered from their cached markup, built the first time they're rendered again."""
+		opening, closing = self._render_split(pretty=pretty)
+		yield opening
+		if getattr(self, "_void", False):
+			if self._html_cache is None:
+				self._html_cache = self._static_markup()
+			return
+		# Dispatch couples looked up in the (weakly keyed) shared table once per class and walk
+		dispatched = {}
+		batches = {}
+		scopes = {}
+		stack = [(self, iter(self._walked_childs(pretty)), closing)]
+		statics = [self._static_markup()]
+		while stack:
+			container, childs, closing = stack[-1]
+			for child in childs:
+				kind, render = dispatched.get(child.__class__) or _walk_dispatch(dispatched, child)
+				if kind == LEAF:
+					if render is _escape_object:
+						statics[-1] = False
+					yield render(child)
+				elif kind == SPLIT:
+					cache = child._html_cache
+					if cache and not pretty and (cache is not True or child._cache_markup):
+						yield cache if cache is not True else child._static_html()
+						continue
+					opening, child_closing = child._render_split(pretty=pretty)
+					yield opening
+					if child._void:
+						if cache is None:
+							cache = child._html_cache = child._static_markup()
+						if not cache:
+							statics[-1] = False
+					else:
+						grandchilds = child.childs if child._prototype is None else child._walked_childs(pretty)
+						stack.append((child, iter(grandchilds), child_closing))
+						statics.append(child._static_markup())
+						break
+				elif kind == ELEMENT:
+					statics[-1] = False
+					if child._scoped:
+						yield from child._iter_render_parts(pretty=pretty, scope=content_scope(container, scopes))
+					else:
+						yield from child._iter_render_parts(pretty=pretty)
+				else:
+					statics[-1] = False
+					try:
+						batch = batches[id(container)]
+					except KeyError:
+						batch = batches[id(container)] = ObjectBatch(container, pretty=pretty)
+					yield batch.render(child)
+			else:
+				stack.pop()
+				static = statics.pop()
+				if container._html_cache is None:
+					container._html_cache = static
+				if not static and statics:
+					statics[-1] = False
+				yield closing
+
+	def _walked_childs(self, pretty=False):
+		"""Childs walked by the render walks. Instance elements sharing their prototype's childs (see tempy.prototype)
+		are rendered with them, pretty rendering copies them: the prototype's depth could differ."""
+		prototype = self._prototype
+		if prototype is None or pretty:
+			return self.childs
+		return prototype.childs
+
+	def _static_markup(self):
+		"""True if this element's own markup (opening and closing) doesn't depend on render time data."""
+		return True
+
+	def cache_markup(self, enable=True):
+		"""Keeps the markup of this element while its subtree is static: the subtree is rendered once
+		and the next renders reuse its markup.
+		A subtree is static when it's made only of standard rendering Tempy elements, strings, numbers and Escaped.
+		The cached markup is dropped by the TemPy methods modifying the subtree (append, pop, attr, css...),
+		direct changes of the childs list or of the attrs dict are not detected: call cache_markup(False)
+		after them, or avoid them in cached subtrees."""
+		self._cache_markup = enable
+		self._invalidate_html()
+		return self
+
+	def _static_html(self):
+		"""Returns the markup of this element if its subtree is static, False otherwise.
+		Every element of the subtree is marked as static or dynamic, only this element keeps its markup.
+		Marks and markup are dropped by the DOMModifier methods (see _invalidate_html).
+		_html_cache is None for elements never checked, True for elements known static, False for dynamic ones."""
+		cache = self._html_cache
+		if cache is not None and cache is not True:
+			return cache
+		# Dispatch couples looked up in the (weakly keyed) shared table once per class and walk
+		dispatched = {}
+		stack = [(self, iter(self._walked_childs()))]
+		while stack:
+			node, childs = stack[-1]
+			if not node._static_markup():
+				break
+			for child in childs:
+				kind, render = dispatched.get(child.__class__) or _walk_dispatch(dispatched, child)
+				if kind == SPLIT:
+					cache = child._html_cache
+					if cache is None:
+						stack.append((child, iter(child._walked_childs())))
+						break
+					if cache is False:
+						break
+				elif kind != LEAF or render is _escape_object:
+					break
+			else:
+				stack.pop()
+				node._html_cache = "".join(node._walk_split_parts()) if node is self else True
+				continue
+			if stack[-1][0] is node:
+				break
+		# A dynamic descendant makes all the elements of the current path dynamic
+		for node, _ in stack:
+			node._html_cache = False
+		return self._html_cache
+
+	def _invalidate_html(self):
+		"""Drops the cached markup (or static/dynamic mark) of this element and of all its ancestors.
+		Called by every method modifying the element's childs or attributes."""
+		node = self
+		while node and node._html_cache is not None:
+			node._html_cache = None
+			node = node.parent
+
+	def _iter_bound_render_parts(self, args, kwargs, pretty=False):
+		with self._render_context(args, kwargs):
+			yield from self._iter_render_parts(pretty=pretty)
+
+	def iter_render(self, *args, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+		"""Generator rendering this element in chunks of at least chunk_size characters (but the last one).
+		Same api as render, the tree is walked depth-first while yielding, so only the current chunk is kept in memory.
+		"""
+		pretty = kwargs.pop("pretty", False)
+		buffer, size = [], 0
+		for part in isolated(self._iter_bound_render_parts(args, kwargs, pretty)):
+			buffer.append(part)
+			size += len(part)
+			if size >= chunk_size:
+				yield "".join(buffer)
+				buffer, size = [], 0
+		if buffer:
+			yield "".join(buffer)
+
+	def render_into(self, stream, *args, encoding="utf-8", **kwargs):
+		"""Renders this element writing the markup directly in the given stream, no intermediate string is built.
+		stream can be a text stream (io.StringIO, text files), a binary stream or a bytearray,
+		binary destinations are written using the given encoding. Returns the stream.
+		Same api as render for last minute content injection.
+		"""
+		pretty = kwargs.pop("pretty", False)
+		if isinstance(stream, bytearray):
+			def write(part):
+				stream.extend(part.encode(encoding))
+		elif isinstance(stream, (RawIOBase, BufferedIOBase)):
+			def write(part):
+				stream.write(part.encode(encoding))
+		else:
+			write = stream.write
+		with self._render_context(args, kwargs):
+			for part in self._iter_render_parts(pretty=pretty):
+				write(part)
+		return stream
+
+	def render_async(self, *args, **kwargs):
+		"""Async version of render, returns a coroutine: see tempy.asyncrender.render_async."""
+		from .asyncrender import render_async
+		return render_async(self, *args, **kwargs)
+
+	def iter_render_async(self, *args, **kwargs):
+		"""Async generator version of iter_render: see tempy.asyncrender.iter_render_async."""
+		from .asyncrender import iter_render_async
+		return iter_render_async(self, *args, **kwargs)
+
 	def render_childs(self, pretty=False):
 		"""Public api to render all the childs using Tempy rules"""
 		return "".join(self._iter_child_renders(pretty=pretty))
@@ -107,7 +354,7 @@ class DOMRenderer(TempyClass):
 	def render_attrs(self):
 		"""Renders the tag's attributes using the formats and performing special attributes name substitution."""
 		ret = []
-		for k, v in self.attrs.items():
+		for k, v in _attrs_items(self.attrs):
 			if v:
 				if v is bool:
 					ret.append(" %s" % self._SPECIAL_ATTRS.get(k, k))
@@ -117,18 +364,217 @@ class DOMRenderer(TempyClass):
 		return "".join(ret)
 
 
+# Kinds of childs:
+# LEAF: rendered calling the dispatch renderer with the child (strings, numbers, Escaped, objects without TempyREPRs)
+# SPLIT: Tempy elements rendered as opening markup, childs and closing markup
+# ELEMENT: Tempy elements with a custom rendering
+# OBJECT: objects with TempyREPR classes, rendered according to their position in the tree
+LEAF, SPLIT, ELEMENT, OBJECT = range(4)
+# Per-class caches are weakly keyed: classes made at runtime (i.e. by the T factory) are not kept alive
+_CHILD_DISPATCH = WeakKeyDictionary()
+# TempyREPR resolution caches:
+# object class -> (TempyREPR candidates, True if all the candidates' scorers are positional)
+_REPR_CANDIDATES = WeakKeyDictionary()
+# TempyREPR class -> ((TempyPlace, scorer function), ...)
+_REPR_SCORERS = WeakKeyDictionary()
+# (object class, container position signature) -> best TempyREPR
+_REPR_RESOLUTIONS = {}
+REPR_CACHE_SIZE = 4096
+# Container classes holding, in their own _patched_views, TempyREPR class -> class used to render objects
+# with that TempyREPR in that container. Kept on the container class: patched classes subclass it
+_PATCHED_CONTAINERS = WeakSet()
+
+
+def _patched_init(self, obj, container):
+	# MRO would init only the TempyREPR class, we init the element as the container class
+	container.__class__.__init__(self)
+	# Forced adoption of the patched element as son of the container
+	self.parent = container
+	self._bind(obj)
+
+
+def _patched_class(tempy_repr_cls, container_cls):
+	"""Returns the class mixing the TempyREPR and the container class, built once per couple."""
+	try:
+		views = container_cls.__dict__["_patched_views"]
+	except KeyError:
+		views = container_cls._patched_views = {}
+		_PATCHED_CONTAINERS.add(container_cls)
+	try:
+		return views[tempy_repr_cls]
+	except KeyError:
+		patched = views[tempy_repr_cls] = type(
+			"Patched%s" % tempy_repr_cls.__name__, (tempy_repr_cls, container_cls), {"__init__": _patched_init}
+		)
+		return patched
+
+
+def clear_caches():
+	"""Clears the per-class rendering caches.
+	Caches are keyed by class, so they never need to be cleared after tree modifications:
+	use this only when classes are modified after being rendered (i.e. adding a TempyREPR to a model class,
+	or changing a Tempy class render method)."""
+	_CHILD_DISPATCH.clear()
+	_REPR_CANDIDATES.clear()
+	_REPR_SCORERS.clear()
+	_REPR_RESOLUTIONS.clear()
+	for container_cls in list(_PATCHED_CONTAINERS):
+		del container_cls._patched_views
+	_PATCHED_CONTAINERS.clear()
+
+
+def _repr_candidates(cls):
+	"""Returns the TempyREPR classes declared in the given class, and True if all their scorers are positional."""
+	try:
+		return _REPR_CANDIDATES[cls]
+	except KeyError:
+		candidates = tuple(DOMRenderer._filter_classes(cls.__dict__.values(), TempyREPR))
+		positional = all(
+			getattr(scorer, "_positional", False) for repr_cls in candidates for _, scorer in _repr_scorers(repr_cls)
+		)
+		_REPR_CANDIDATES[cls] = candidates, positional
+		return candidates, positional
+
+
+class ObjectBatch:
+	"""Renders the non-Tempy objects of a container, one at a time, sharing the work between
+	consecutive objects of the same class:
+	- the TempyREPR is resolved once, if the resolution depends only on the container position
+	- if the TempyREPR declares a shared skeleton (see TempyREPR), the tree is built and compiled once
+	  and rendered for each object with the object's attributes as content data.
+	"""
+
+	def __init__(self, container, pretty=False):
+		self.container = container
+		self.pretty = pretty
+		self._cls = None
+		self._view = None
+		self._skeleton = None
+		self._compiled = None
+
+	def _start_run(self, obj):
+		self._cls = obj.__class__
+		self._skeleton = self._compiled = None
+		candidates, positional = _repr_candidates(self._cls)
+		self._view = self.container._search_for_view(obj) if positional and candidates else None
+		if self._view:
+			element = _patched_class(self._view, self.container.__class__)(obj, self.container)
+			if self._view._shared_skeleton:
+				self._skeleton = element
+				self._compiled = element.compile(pretty=self.pretty)
+			return element.render(pretty=self.pretty)
+		return None
+
+	def render(self, obj):
+		if obj.__class__ is not self._cls:
+			rendered = self._start_run(obj)
+			if rendered is not None:
+				return rendered
+		elif self._compiled:
+			self._skeleton.content_data.obj = obj
+			return self._compiled()
+		elif self._view:
+			return self.container._render_tempy_repr(self._view, obj, pretty=self.pretty)
+		return self.container._render_object(obj, pretty=self.pretty)
+
+
+def _repr_scorers(repr_cls):
+	"""Returns the scorers of all the TempyPlaces used by the given TempyREPR class."""
+	try:
+		return _REPR_SCORERS[repr_cls]
+	except KeyError:
+		scorers = _REPR_SCORERS[repr_cls] = tuple(
+			(place_cls, scorer)
+			for place_cls in DOMRenderer._filter_classes(repr_cls.__mro__[1:], TempyPlace)
+			for scorer in place_cls._place_scorers()
+		)
+		return scorers
+
+
+# style and klass are rendered first, whenever they have been created
+_LEADING_ATTRS = {"style": 0, "klass": 1}
+
+
+def _attrs_items(attrs):
+	if "style" in attrs or "klass" in attrs:
+		return sorted(attrs.items(), key=lambda item: _LEADING_ATTRS.get(item[0], 2))
+	return attrs.items()
+
+
+def _escape_object(obj):
+	return escape(str(obj))
+
+
+def _escaped_render(escaped):
+	return escaped.render
+
+
+def _walk_dispatch(dispatched, child):
+	"""child_dispatch, stored in the dispatched dict of a walk for the next childs of the same type."""
+	dispatch = dispatched[child.__class__] = child_dispatch(child)
+	return dispatch
+
+
+def child_dispatch(child):
+	"""Returns the (kind, renderer) couple used to render childs of the same type of the given child.
+	The couple is computed once per type, so elements' rendering should depend on their class only."""
+	cls = child.__class__
+	try:
+		return _CHILD_DISPATCH[cls]
+	except KeyError:
+		pass
+	if issubclass(cls, str):
+		dispatch = (LEAF, escape)
+	elif issubclass(cls, Number):
+		dispatch = (LEAF, str)
+	elif cls.__name__ == "Escaped":
+		dispatch = (LEAF, _escaped_render)
+	elif issubclass(cls, TempyClass):
+		dispatch = (SPLIT, None) if child._splittable() else (ELEMENT, None)
+	elif any(DOMRenderer._filter_classes(cls.__dict__.values(), TempyREPR)):
+		dispatch = (OBJECT, None)
+	else:
+		dispatch = (LEAF, _escape_object)
+	_CHILD_DISPATCH[cls] = dispatch
+	return dispatch
+
+
+def _code_walked(element):
+	"""True for the elements whose code is built by the to_code walk, false for those with their own to_code."""
+	return type(element).to_code is CodeRenderer.to_code
+
+
 class CodeRenderer(TempyClass):
+	__slots__ = ()
+
+	def compile(self, pretty=False):
+		"""Compiles this element in a flat python function, see tempy.compiler.TempyCompiler"""
+		from .compiler import compile_template
+		return compile_template(self, pretty=pretty)
+
 	def to_code(self, pretty=False):
-		ret = []
-		prettying = "\n" + ("\t" * self._depth) if pretty else ""
-		childs_to_code = []
-		for child in self.childs:
-			if issubclass(child.__class__, TempyClass):
-				child_code = child.to_code(pretty=pretty)
-				childs_to_code.append(child_code)
+		# Postorder walk with an explicit stack: every element code needs its childs codes.
+		# Elements with their own to_code (Escaped included) are not walked, their to_code is called.
+		stack = []
+		for node, entering in self._traverse(expand=_code_walked):
+			if entering:
+				stack.append([])
+				continue
+			if entering is False:
+				code = node._element_code(stack.pop(), pretty)
+				if not stack:
+					return code
 			else:
-				childs_to_code.append('"""%s"""' % child)
+				kind, render = child_dispatch(node)
+				if kind == SPLIT or kind == ELEMENT or render is _escaped_render:
+					code = node.to_code(pretty=pretty)
+				else:
+					code = '"""%s"""' % node
+			stack[-1].append(code)
 
+	def _element_code(self, childs_to_code, pretty):
+		"""Python code building this element, given the code of its childs."""
+		prettying = "\n" + ("\t" * self._depth) if pretty else ""
 		childs_code = ""
 		if childs_to_code:
 			childs_code = "(%s%s%s)" % (prettying, ", ".join(childs_to_code), prettying)
@@ -138,8 +584,7 @@ class CodeRenderer(TempyClass):
 			if getattr(self, "_void", False):
 				class_code += "Void."
 		class_code += self.__class__.__name__
-		ret.append("%s(%s)%s" % (class_code, self.to_code_attrs(), childs_code))
-		return "".join(ret)
+		return "%s(%s)%s" % (class_code, self.to_code_attrs(), childs_code)
 
 	def to_code_attrs(self):
 		def formatter(k, v):
@@ -153,8 +598,8 @@ class CodeRenderer(TempyClass):
 			return "%s=%s" % (k_norm, v)
 
 		twist_specials = {v: k for k, v in self._SPECIAL_ATTRS.items()}
-		return ", ".join(formatter(k, v) for k, v in self.attrs.items() if v)
+		return ", ".join(formatter(k, v) for k, v in _attrs_items(self.attrs) if v)
 
 
 class TempyRenderer(CodeRenderer, DOMRenderer):
-	pass
+	__slots__ = ()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Css selectors used by DOMNavigator.find.
+Supported: type (tag name or Tempy class name), universal, #id, .class, [attr], [attr=value] (and ~= |= ^= $= *=),
+:nth-child, :nth-last-child, :first-child, :last-child, descendant, child (>), adjacent (+) and general (~) sibling
+combinators and selector lists (,).
+Selectors are compiled once and cached, and matched right to left climbing the parent pointers."""
+import re
+from functools import lru_cache
+
+from .bases import TempyClass, tag_name_of
+from .exceptions import SelectorError
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?P<combinator>[>+~,])\s*
+    | (?P<space>\s+)
+    | (?P<type>\*|[\w-]+)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<klass>[\w-]+)
+    | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<value>[^\]\s]+))\s*)?\]
+    | :(?P<pseudo>[\w-]+)(?:\(\s*(?P<arg>[^)]*?)\s*\))?
+    """,
+    re.VERBOSE,
+)
+_KINDS = ("combinator", "space", "type", "id", "klass", "attr", "pseudo")
+_NTH = re.compile(r"^(?:(?P<a>[+-]?\d*)n\s*(?:(?P<sign>[+-])\s*(?P<b>\d+))?|(?P<only_b>[+-]?\d+))$")
+
+_ATTR_OPS = {
+    "=": lambda value, expected: value == expected,
+    "~=": lambda value, expected: expected in value.split(),
+    "|=": lambda value, expected: value == expected or value.startswith(expected + "-"),
+    "^=": lambda value, expected: bool(expected) and value.startswith(expected),
+    "$=": lambda value, expected: bool(expected) and value.endswith(expected),
+    "*=": lambda value, expected: bool(expected) and expected in value,
+}
+
+DESCENDANT, CHILD, ADJACENT, SIBLING = " ", ">", "+", "~"
+
+
+def _parse_nth(selector, arg):
+    """Parses an an+b expression in a (a, b) tuple."""
+    arg = arg.replace(" ", "").lower() if arg else ""
+    if arg == "odd":
+        return 2, 1
+    if arg == "even":
+        return 2, 0
+    nth = _NTH.match(arg)
+    if not nth:
+        raise SelectorError(selector, "Wrong nth expression: %r" % arg)
+    if nth.group("only_b") is not None:
+        return 0, int(nth.group("only_b"))
+    a = nth.group("a")
+    a = {"": 1, "+": 1, "-": -1}.get(a) or int(a)
+    b = int(nth.group("b") or 0) * (-1 if nth.group("sign") == "-" else 1)
+    return a, b
+
+
+def _nth_match(a, b, position):
+    if not a:
+        return position == b
+    steps, rest = divmod(position - b, a)
+    return not rest and steps >= 0
+
+
+class _Siblings:
+    """Element siblings of the elements matched during a single selection, computed once per parent."""
+
+    __slots__ = ("_parents", )
+
+    def __init__(self):
+        self._parents = {}
+
+    def of(self, element):
+        """Returns the element siblings (element included) and the position of the element, or (None, -1)."""
+        parent = element.parent
+        if not parent:
+            return None, -1
+        try:
+            elements, positions = self._parents[id(parent)]
+        except KeyError:
+            elements = [child for child in parent.childs if isinstance(child, TempyClass)]
+            positions = {id(child): position for position, child in enumerate(elements)}
+            self._parents[id(parent)] = elements, positions
+        return elements, positions.get(id(element), -1)
+
+
+class Compound:
+    """A sequence of simple selectors with no combinators, i.e: div#main.big[title]:first-child"""
+
+    __slots__ = ("tag", "css_id", "classes", "attrs", "nths")
+
+    def __init__(self):
+        self.tag = None
+        self.css_id = None
+        self.classes = ()
+        self.attrs = ()
+        self.nths = ()
+
+    def __bool__(self):
+        return bool(self.tag or self.css_id or self.classes or self.attrs or self.nths)
+
+    @staticmethod
+    def _attr_value(key, value):
+        if value is bool:
+            return ""
+        formatter = TempyClass._FORMAT_ATTRS.get(key)
+        return formatter(value) if formatter else str(value)
+
+    def match(self, element, siblings):
+        if not isinstance(element, TempyClass):
+            return False
+        tag = self.tag
+        if tag and tag != "*" and tag != element.__class__.__name__ and (
+            tag.lower() != tag_name_of(element)
+        ):
+            return False
+        if self.css_id is not None or self.classes or self.attrs:
+            attrs = getattr(element, "attrs", None)
+            if attrs is None:
+                return False
+            if self.css_id is not None and (attrs.get("id") is None or str(attrs["id"]) != self.css_id):
+                return False
+            if self.classes:
+                css_classes = attrs.get("klass", ())
+                for css_class in self.classes:
+                    if css_class not in css_classes:
+                        return False
+            for key, op, expected in self.attrs:
+                value = attrs.get(key)
+                if value is None or (not value and key in TempyClass._FORMAT_ATTRS):
+                    return False
+                if op and not _ATTR_OPS[op](self._attr_value(key, value), expected):
+                    return False
+        if self.nths:
+            elements, position = siblings.of(element)
+            if position < 0:
+                return False
+            for from_last, a, b in self.nths:
+                if not _nth_match(a, b, len(elements) - position if from_last else position + 1):
+                    return False
+        return True
+
+
+class Selector:
+    """A compiled selector list. Every complex selector is stored right to left, as a list of
+    (compound, combinator) where the combinator links the compound to the next one on its left."""
+
+    __slots__ = ("text", "alternatives")
+
+    def __init__(self, text):
+        self.text = text
+        self.alternatives = self._parse(text)
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.text)
+
+    def _parse(self, text):
+        alternatives = []
+        parts = []
+        compound = Compound()
+        combinator = None
+        text = text.strip()
+        position, end = 0, len(text)
+        while position < end:
+            token = _TOKEN.match(text, position)
+            if not token:
+                raise SelectorError(text, "Unexpected character at position %d: %r" % (position, text[position]))
+            position = token.end()
+            kind = next(kind for kind in _KINDS if token.group(kind) is not None)
+            if kind in ("combinator", "space"):
+                if not compound:
+                    raise SelectorError(text, "Missing selector before %r" % token.group().strip())
+                parts.append((compound, combinator))
+                compound = Compound()
+                combinator = token.group("combinator") or DESCENDANT
+                if combinator == ",":
+                    alternatives.append(parts)
+                    parts, combinator = [], None
+            elif kind == "type":
+                if compound:
+                    raise SelectorError(text, "Type selector %r should come first" % token.group("type"))
+                compound.tag = token.group("type")
+            elif kind == "id":
+                compound.css_id = token.group("id")
+            elif kind == "klass":
+                compound.classes += (token.group("klass"), )
+            elif kind == "attr":
+                key = token.group("attr")
+                expected = next((v for v in token.group("dq", "sq", "value") if v is not None), None)
+                compound.attrs += ((TempyClass._TO_SPECIALS.get(key, key), token.group("op"), expected), )
+            elif kind == "pseudo":
+                compound.nths += (self._parse_pseudo(text, token.group("pseudo").lower(), token.group("arg")), )
+        if not compound:
+            raise SelectorError(text, "Selector should not end with a combinator")
+        parts.append((compound, combinator))
+        alternatives.append(parts)
+        # Stored right to left: the combinator of each compound links it to the previous one
+        return [parts[::-1] for parts in alternatives]
+
+    @staticmethod
+    def _parse_pseudo(text, pseudo, arg):
+        if pseudo == "first-child":
+            return False, 0, 1
+        if pseudo == "last-child":
+            return True, 0, 1
+        if pseudo in ("nth-child", "nth-last-child"):
+            return (pseudo == "nth-last-child", ) + _parse_nth(text, arg)
+        raise SelectorError(text, "Pseudo class not supported: %r" % pseudo)
+
+    def _match_left(self, parts, index, element, siblings, results):
+        """Matches the parts left of parts[index - 1], already matched by element.
+        The (parts, index, element) results are stored in results and reused during a selection: a descendant
+        combinator stops climbing at the first ancestor already tried, so matching is linear in depth."""
+        if index == len(parts):
+            return True
+        key = (id(parts), index, id(element))
+        found = results.get(key)
+        if found is not None:
+            return found
+        combinator = parts[index - 1][1]
+        compound = parts[index][0]
+        if combinator in (DESCENDANT, CHILD):
+            ancestor = element.parent
+            while ancestor:
+                if compound.match(ancestor, siblings) and (
+                    self._match_left(parts, index + 1, ancestor, siblings, results)
+                ):
+                    found = True
+                    break
+                if combinator == CHILD:
+                    break
+                found = results.get((id(parts), index, id(ancestor)))
+                if found is not None:
+                    break
+                ancestor = ancestor.parent
+        else:
+            elements, position = siblings.of(element)
+            first = position - 1 if combinator == ADJACENT else 0
+            for sibling in elements[max(first, 0):position] if position > 0 else ():
+                if compound.match(sibling, siblings) and self._match_left(parts, index + 1, sibling, siblings, results):
+                    found = True
+                    break
+        results[key] = found = bool(found)
+        return found
+
+    def match(self, element, siblings=None, results=None):
+        """True if the element matches this selector."""
+        siblings = siblings or _Siblings()
+        results = {} if results is None else results
+        for parts in self.alternatives:
+            if parts[0][0].match(element, siblings) and self._match_left(parts, 1, element, siblings, results):
+                return True
+        return False
+
+    def select(self, elements):
+        """Returns the set of the given elements matching this selector."""
+        siblings = _Siblings()
+        results = {}
+        return {element for element in elements if self.match(element, siblings, results)}
+
+    def candidates(self, index):
+        """Elements of the TreeIndex that could match this selector, found using the rightmost compounds."""
+        found = set()
+        for parts in self.alternatives:
+            compound = parts[0][0]
+            if compound.css_id is not None:
+                found |= index.by_id(compound.css_id)
+            elif compound.classes:
+                found |= min((index.by_class(css_class) for css_class in compound.classes), key=len)
+            elif compound.tag and compound.tag != "*":
+                found |= index.by_tag(compound.tag)
+            else:
+                return index.elements()
+        return found
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text):
+    """Returns the compiled Selector for the given css selector string, compiled selectors are cached."""
+    return Selector(text)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Async content sources: awaitables and async iterables given as content of Content placeholders,
+resolved by the async renders (see tempy.asyncrender). Requires Python >= 3.6."""
+import asyncio
+import inspect
+from itertools import chain
+
+from .bases import TempyClass
+
+
+class AsyncSource:
+    """An awaitable or async iterable used as content, resolved once per render and shared by all
+    the Content placeholders using it. Async iterables are collected in a list.
+    Eager sources are used by placeholders the streaming render can't wait for (see collect_sources)."""
+
+    __slots__ = ("source", "eager", "done", "value", "task")
+
+    def __init__(self, source):
+        self.source = source
+        self.eager = False
+        self.done = False
+        self.value = None
+        self.task = None
+
+    def __repr__(self):
+        return "<%s.%s of %r>" % (self.__module__, type(self).__name__, self.source)
+
+    async def _resolve(self):
+        source = self.source
+        if hasattr(source, "__aiter__"):
+            value = [item async for item in source]
+        else:
+            value = await source
+        self.value, self.done = value, True
+
+    def start(self):
+        """Starts resolving the source in a new task, returns the task."""
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._resolve())
+        return self.task
+
+
+def is_async_source(content):
+    return inspect.isawaitable(content) or hasattr(content, "__aiter__")
+
+
+def _walked(node, element):
+    """True if the render walk of element renders node itself, yielding its parts (see DOMRenderer._walk_split_parts).
+    Elements with a custom render are rendered as a whole, and so are their descendants."""
+    parent = node.parent
+    while parent and parent is not element:
+        if not parent._splittable():
+            return False
+        parent = parent.parent
+    return parent is element and element._splittable()
+
+
+def collect_sources(element):
+    """Returns the async sources used by the Content placeholders of the element's tree, mapped by source id.
+    To be called with the render bindings active, so that render time contents are found."""
+    sources = {}
+    for node in chain((element, ), element._descendants()):
+        if not (isinstance(node, TempyClass) and node._scoped):
+            continue
+        content = node._raw_content()
+        if not is_async_source(content):
+            continue
+        source = sources.get(id(content))
+        if source is None:
+            source = sources[id(content)] = AsyncSource(content)
+        if node is element or not _walked(node, element):
+            source.eager = True
+    return sources
+
+
+async def resolve_sources(sources):
+    """Resolves all the given sources concurrently, if one of them fails the others are cancelled."""
+    tasks = [source.start() for source in sources]
+    if not tasks:
+        return
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
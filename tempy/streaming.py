@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# @author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""Streaming of Tempy trees as chunked http responses"""
+from http import HTTPStatus
+
+from .renderer import DEFAULT_CHUNK_SIZE
+
+
+class StreamingResponse:
+    """Streams a Tempy tree using DOMRenderer.iter_render.
+    Iterating the response yields encoded chunks, so it can be used as body of any framework's streaming response.
+    The response object itself is a WSGI application, the asgi method is an ASGI application
+    (awaitables and async iterables can be given as contents, see DOMRenderer.iter_render_async):
+    >>> def wsgi_app(environ, start_response):
+    >>>     return StreamingResponse(page, user=user)(environ, start_response)
+    >>> async def asgi_app(scope, receive, send):
+    >>>     await StreamingResponse(page, user=user).asgi(scope, receive, send)
+    Args and kwargs are used as in Tag.render for last minute content injection.
+    """
+
+    def __init__(self, tree, *args, status=200, headers=None, encoding="utf-8",
+                 chunk_size=DEFAULT_CHUNK_SIZE, pretty=False, **kwargs):
+        self.tree = tree
+        self.status = HTTPStatus(status)
+        self.encoding = encoding
+        self.headers = [("Content-Type", "text/html; charset=%s" % encoding)]
+        self.headers.extend(headers or [])
+        self.chunk_size = chunk_size
+        self.pretty = pretty
+        self._render_args = args
+        self._render_kwargs = kwargs
+
+    def __iter__(self):
+        for chunk in self.tree.iter_render(
+                *self._render_args, chunk_size=self.chunk_size, pretty=self.pretty, **self._render_kwargs
+        ):
+            yield chunk.encode(self.encoding)
+
+    def __call__(self, environ, start_response):
+        start_response("%d %s" % (self.status.value, self.status.phrase), self.headers)
+        return iter(self)
+
+    def asgi(self, scope, receive, send):
+        """ASGI application, returns a coroutine: see tempy.asyncrender.asgi_response."""
+        from .asyncrender import asgi_response
+        return asgi_response(self, scope, receive, send)
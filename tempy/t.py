@@ -81,7 +81,7 @@ class TempyFactory:
         return type(
             tage_name,
             (base_class, ),
-            {"_%s__tag" % tage_name: tage_name.lower(), "_from_factory": True},
+            {"_%s__tag" % tage_name: tage_name.lower(), "_from_factory": True, "__slots__": ()},
         )
 
     def __getattribute__(self, attr):
@@ -4,6 +4,7 @@
 All the HTML tags as defined in the W3C reference, in alphabetical order.
 """
 from .elements import Tag, VoidTag
+from .renderer import child_dispatch, LEAF, _escape_object
 
 DOCTYPES = {
     "html": "HTML",
@@ -23,6 +24,7 @@ DOCTYPES = {
 
 
 class Comment(VoidTag):
+    __slots__ = ("_comment", )
     __tag = ""
     _template = "<!-- %s -->"
 
@@ -44,6 +46,7 @@ class Doctype(VoidTag):
     xhtml_frameset, xhtml_1_1_dtd, xhtml_basic_1_1
     """
 
+    __slots__ = ("type_code", )
     __tag = "!DOCTYPE"
     _template = "<{tag}{type}>"
 
@@ -64,6 +67,7 @@ class Html(Tag):
     Every Html object is associated with a Doctype object (default doctype code: 'html').
     """
 
+    __slots__ = ("doctype", )
     __tag = "html"
 
     def __init__(self, *args, **kwargs):
@@ -72,29 +76,44 @@ class Html(Tag):
         super().__init__(**kwargs)
         self.doctype = Doctype(doctype)
 
-    def render(self, *args, **kwargs):
+    def _render_split(self, pretty=False):
         """Override so each html page served have a doctype"""
-        return self.doctype.render() + super().render(*args, **kwargs)
+        opening, closing = super()._render_split(pretty=pretty)
+        return self.doctype.render() + opening, closing
+
+    def _static_markup(self):
+        # The doctype can be changed after rendering (see TempyPage.set_doctype)
+        return False
 
 
 class A(Tag):
+    __slots__ = ()
     __tag = "a"
 
-    def render(self, *args, **kwargs):
+    def _render_split(self, pretty=False):
         """Override of the rendering so that if the link have no text in it, the href is used inside the <a> tag"""
+        opening, closing = super()._render_split(pretty=pretty)
+        if not self.childs and "href" in self.attrs:
+            opening += self._render_child(self.attrs["href"], pretty=pretty)
+        return opening, closing
+
+    def _static_markup(self):
         if not self.childs and "href" in self.attrs:
-            return self.clone()(self.attrs["href"]).render(*args, **kwargs)
-        return super().render(*args, **kwargs)
+            kind, render = child_dispatch(self.attrs["href"])
+            return kind == LEAF and render is not _escape_object
+        return True
 
     def apply_function(self, format_function):
         if not self.childs:
             if "href" in self.attrs:
                 self.attrs["href"] = format_function(self.attrs["href"])
+                self._invalidate_html()
         else:
             super().apply_function(format_function)
 
 
 class Title(Tag):
+    __slots__ = ()
     __tag = "title"
 
     def __init__(self, title=None):
@@ -233,7 +252,7 @@ for tag_parent_cls, tags in tags.items():
         tag_cls_name = tag.title()
         # Dynamic class definition
         tag_cls = type(
-            tag_cls_name, (tag_parent_cls,), {"_%s__tag" % tag_cls_name: tag}
+            tag_cls_name, (tag_parent_cls,), {"_%s__tag" % tag_cls_name: tag, "__slots__": ()}
         )
         # We put the new dynamically created class inside locals to make it available from the outside
         locals()[tag_cls_name] = tag_cls
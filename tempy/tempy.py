@@ -9,11 +9,45 @@ from .navigator import DOMNavigator
 from .exceptions import WrongContentError
 
 
+def _copied_state(cls):
+    """Returns the slots added by the subclasses of DOMElement and True if the instances have a __dict__,
+    see DOMElement._shallow_copy. Computed once per class and kept in the class' own __dict__."""
+    try:
+        return cls.__dict__["_copied_state_cache"]
+    except KeyError:
+        names = []
+        for klass in cls.__mro__:
+            if klass is DOMElement:
+                break
+            slots = klass.__dict__.get("__slots__", ())
+            for name in (slots, ) if isinstance(slots, str) else slots:
+                if name not in names and name not in ("__dict__", "__weakref__"):
+                    names.append(name)
+        state = cls._copied_state_cache = tuple(names), bool(cls.__dictoffset__)
+        return state
+
+
 class DOMElement(TempyRenderer, DOMNavigator, DOMModifier):
     """Takes care of the tree structure using the "childs" and "parent" attributes.
     Manages the DOM manipulation with proper valorization of those two.
     """
 
+    # Instances are slotted: subclasses can add their own __slots__ to stay compact,
+    # subclasses without __slots__ get a regular instance __dict__.
+    # _html_cache: markup (or True) if this element's subtree is static, False if it's dynamic, None if unknown
+    # _cache_markup: True if this element keeps its markup while static (see cache_markup)
+    # _named: map of the named childs that can't be set as instance attributes
+    # _child_index, _child_stamp: last known position of this element in the parent's childs, and the number
+    # of shifting operations made on the parent's childs when it was stored (see _own_index)
+    # _index_ops, _index_log: number of shifting operations made on this element's childs, and the last ones
+    # _tree_index: lookup tables of this element's tree, if this element is an indexed root (see build_index)
+    # _ancestry_cache: root and depth of this element, see DOMNavigator._ancestry
+    # _prototype: element whose childs are shared by this instance element until they're needed (see tempy.prototype)
+    __slots__ = (
+        "_name", "childs", "parent", "content_data", "_html_cache", "_cache_markup", "_named",
+        "_child_index", "_child_stamp", "_index_ops", "_index_log", "_tree_index", "_ancestry_cache", "_prototype",
+    )
+
     _from_factory = False
 
     def __init__(self, **kwargs):
@@ -21,14 +55,54 @@ class DOMElement(TempyRenderer, DOMNavigator, DOMModifier):
         self.childs = []
         self.parent = None
         self.content_data = kwargs
-        for cls in reversed(self.__class__.__mro__[:-6]):
-            init = getattr(cls, "init", None)
-            if init and init.__name__ in cls.__dict__:
-                init(self)
+        self._html_cache = None
+        self._cache_markup = False
+        self._named = None
+        self._child_index = -1
+        self._child_stamp = 0
+        self._index_ops = 0
+        self._index_log = None
+        self._tree_index = None
+        self._ancestry_cache = None
+        self._prototype = None
+        # init methods defined by the classes in the mro (mixins included), base classes first.
+        # Collected on the first element of every class and kept in the class' own __dict__
+        cls = self.__class__
+        try:
+            hooks = cls.__dict__["_init_hooks"]
+        except KeyError:
+            hooks = cls._init_hooks = tuple(klass.init for klass in reversed(cls.__mro__) if "init" in klass.__dict__)
+        for init in hooks:
+            init(self)
 
     def __hash__(self):
         return id(self)
 
+    def __getattr__(self, attr):
+        # Called only when the normal lookup fails: instance elements get their childs and named childs
+        # from the prototype (see _materialize), the others search the named childs map
+        try:
+            prototype = object.__getattribute__(self, "_prototype")
+        except AttributeError:
+            prototype = None
+        if prototype is not None:
+            self._materialize()
+            return getattr(self, attr)
+        try:
+            return object.__getattribute__(self, "_named")[attr]
+        except (AttributeError, KeyError, TypeError):
+            raise AttributeError("%r object has no attribute %r" % (type(self).__name__, attr))
+
+    def _set_named_child(self, name, child):
+        """Makes the child accessible as an attribute of this element with the given name.
+        Slotted elements keep named childs in a small map."""
+        try:
+            setattr(self, name, child)
+        except AttributeError:
+            if self._named is None:
+                self._named = {}
+            self._named[name] = child
+
     def __bool__(self):
         # Is it normal that without explicit __bool__ definition
         # custom classes evaluates to False?
@@ -66,27 +140,125 @@ class DOMElement(TempyRenderer, DOMNavigator, DOMModifier):
         return len(self.childs)
 
     def __copy__(self):
-        return self.__class__()(
-            copy(c) if isinstance(c, DOMElement) else c for c in self.childs
-        )
+        return self.clone()
 
-    @property
-    def _depth(self):
-        return 0 if self.is_root else self.parent._depth + 1
+    def _shallow_copy(self):
+        """Returns a copy of this element, with copied content data and attributes, not in any tree.
+        Tempy elements held in attributes (e.g. the Html doctype) are cloned.
+        Childs are not copied: the childs slot is left unset, to be set with copies of this element's childs
+        (the markup cache is kept)."""
+        cls = self.__class__
+        new = cls.__new__(cls)
+        extra_slots, has_dict = _copied_state(cls)
+        for name in extra_slots:
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
+            if isinstance(value, DOMElement):
+                if value.parent is self:
+                    # Named childs are set when the childs are copied
+                    continue
+                value = value.clone()
+            setattr(new, name, value)
+        if has_dict:
+            new.__dict__.update(
+                (key, value.clone() if isinstance(value, DOMElement) else value)
+                for key, value in self.__dict__.items()
+                if not (isinstance(value, DOMElement) and value.parent is self)
+            )
+        data = self.content_data
+        new._name = self._name
+        new.parent = None
+        new.content_data = data.copy() if type(data) is dict else copy(data)
+        new._html_cache = self._html_cache
+        new._cache_markup = self._cache_markup
+        new._named = None
+        new._child_index = -1
+        new._child_stamp = 0
+        new._index_ops = 0
+        new._index_log = None
+        new._tree_index = None
+        new._ancestry_cache = None
+        new._prototype = None
+        return new
 
-    @property
-    def is_root(self):
-        return self.root == self
+    def _adopt_copies(self, source):
+        """Sets as childs of this element the shallow copies of the source's childs
+        (strings and objects are shared). Named childs of the source are named childs of this element.
+        Returns the (child, copy) couples of the Tempy childs."""
+        copies = {}
+        couples = []
+        childs = []
+        for index, child in enumerate(source.childs):
+            if isinstance(child, DOMElement):
+                child_copy = copies[id(child)] = child._shallow_copy()
+                child_copy.parent = self
+                child_copy._child_index = index
+                couples.append((child, child_copy))
+                child = child_copy
+            childs.append(child)
+        self.childs = childs
+        if source._named:
+            self._named = {name: copies.get(id(child), child) for name, child in source._named.items()}
+        extra_slots, has_dict = _copied_state(source.__class__)
+        for name in extra_slots:
+            value = getattr(source, name, None)
+            if id(value) in copies:
+                setattr(self, name, copies[id(value)])
+        if has_dict:
+            for key, value in source.__dict__.items():
+                if id(value) in copies:
+                    setattr(self, key, copies[id(value)])
+        return couples
+
+    def _materialize(self):
+        """Sets the childs of this instance element (see tempy.prototype): copies of the prototype's childs,
+        sharing in turn their childs with the prototype's ones."""
+        prototype = self._prototype
+        self._prototype = None
+        for child, child_copy in self._adopt_copies(prototype):
+            child_copy._prototype = child
 
     @property
     def _own_index(self):
-        if self.parent:
-            try:
-                return [id(t) for t in self.parent.childs].index(id(self))
-            except ValueError:
-                return -1
+        """Position of this element in the parent's childs, -1 if not found.
+        The position stored at insertion time is updated with the shifts logged by the parent since then
+        (see BaseDOMModifier._shift_childs) and checked against the parent's childs.
+        If the log is not enough, all the parent's childs positions are stored again at once."""
+        parent = self.parent
+        if parent:
+            childs = parent.childs
+            index = self._child_index
+            missed = parent._index_ops - self._child_stamp
+            if missed:
+                log = parent._index_log
+                if log and missed <= len(log):
+                    for position, delta in log[len(log) - missed:]:
+                        if index >= position:
+                            index += delta
+                else:
+                    index = -1
+            if not (0 <= index < len(childs) and childs[index] is self):
+                parent._index_childs()
+                index = self._child_index
+                if not (0 <= index < len(childs) and childs[index] is self):
+                    return -1
+            self._child_index = index
+            self._child_stamp = parent._index_ops
+            return index
         return -1
 
+    def _index_childs(self):
+        """Stores in every child its position in this element's childs."""
+        ops = self._index_ops
+        childs = self.childs
+        for index in range(len(childs) - 1, -1, -1):
+            child = childs[index]
+            if isinstance(child, DOMElement):
+                child._child_index = index
+                child._child_stamp = ops
+
     @property
     def index(self):
         """Returns the position of this element in the parent's childs list.
@@ -146,3 +318,9 @@ class Escaped(DOMElement):
     def __init__(self, content, **kwargs):
         super().__init__(**kwargs)
         self.render = content
+
+    def _iter_render_parts(self, pretty=False):
+        yield self.render
+
+    def to_code(self, pretty=False):
+        return 'Escaped("""%s""")' % self.render
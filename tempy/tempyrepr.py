@@ -6,13 +6,38 @@ those are used by Tempy to render instances of those models inside a Tempy tree.
 from .exceptions import IncompleteREPRError
 
 
+# class -> names defined by its TempyREPR classes, see TempyREPR.__getattribute__
+_REPR_NAMES = {}
+
+
+def _repr_names(cls):
+    try:
+        return _REPR_NAMES[cls]
+    except KeyError:
+        names = _REPR_NAMES[cls] = frozenset(
+            name for klass in cls.__mro__ if issubclass(klass, TempyREPR) for name in klass.__dict__
+        )
+        return names
+
+
 class TempyREPR:
     """Helper Class to provide views for custom objects.
     Objects of classes with a nested TempyREPR subclass are rendered using the TempyREPR subclass as a template.
+    Views whose repr doesn't use the object, and shows it only through Content placeholders (searched in the
+    object's attributes), can set _shared_skeleton = True: consecutive objects of the same class are then
+    rendered with a single view tree, built and compiled once.
     """
 
+    _shared_skeleton = False
+
     def __init__(self, obj):
         super().__init__()
+        self._bind(obj)
+
+    def _bind(self, obj):
+        """Sets the represented object and builds the representation.
+        Content placeholders used in the representation are searched in the object's attributes too."""
+        self.content_data = ReprContentData(obj, self.content_data)
         self.obj = obj
         try:
             self.repr()
@@ -22,8 +47,14 @@ class TempyREPR:
             )
 
     def __getattribute__(self, attr):
+        if attr[:2] == "__" or attr in _repr_names(type(self)):
+            # Special names and names defined by the TempyREPR classes are searched in the Tempy element first
+            try:
+                return super().__getattribute__(attr)
+            except AttributeError:
+                return getattr(super().__getattribute__("obj"), attr)
         try:
-            return super().__getattribute__("obj").__getattribute__(attr)
+            return getattr(super().__getattribute__("obj"), attr)
         except AttributeError:
             return super().__getattribute__(attr)
 
@@ -37,3 +68,31 @@ class TempyPlace(TempyREPR):
 
     _pointer_class = None
     _base_place = True
+
+    @classmethod
+    def _place_scorers(cls):
+        """Scorer methods (_reprscore*) of this place."""
+        return tuple(getattr(cls, name) for name in dir(cls) if name.startswith("_reprscore"))
+
+
+def positional_scorer(scorer):
+    """Marks a TempyPlace scorer method whose result depends only on the container position in the tree:
+    classes of the container, of its parent and of its adjacent siblings.
+    TempyREPR resolutions involving only positional scorers are cached."""
+    scorer._positional = True
+    return scorer
+
+
+class ReprContentData(dict):
+    """Content data of the TempyREPR elements: contents not found in the data
+    are searched in the represented object's attributes."""
+
+    def __init__(self, obj, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.obj = obj
+
+    def __missing__(self, key):
+        try:
+            return getattr(self.obj, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
@@ -15,8 +15,7 @@ def render_template(template_name, start_directory=None, **kwargs):
     if start_directory:
         sys.path.append(start_directory)
     template_module = importlib.import_module("templates.%s" % template_name)
-    template = template_module.template.inject(**kwargs)
-    return template.render()
+    return template_module.template.render(**kwargs)
 
 
 class AdjustableList(list):
@@ -83,28 +83,33 @@ class TempyListMeta:
         return self
 
     def __process_li_struct(self, struct):
-        for k, submenu in struct.items():
-            item = tags.Li()(k)
-            self(item)
-            if submenu:
-                item(TempyList(typ=self._typ, struct=submenu))
+        self.extend_children(
+            tags.Li()(k, TempyList(typ=self._typ, struct=submenu)) if submenu else tags.Li()(k)
+            for k, submenu in struct.items()
+        )
 
     def __process_dl_struct(self, struct):
+        self.extend_children(self.__dl_items(struct))
+
+    @staticmethod
+    def __dl_items(struct):
         for k, submenu in struct.items():
-            item = tags.Dt()(k)
-            self(item)
+            yield tags.Dt()(k)
             if submenu:
                 if isinstance(submenu, (list, set, tuple, dict)):
                     for elem in submenu:
-                        self(tags.Dd()(elem))
+                        yield tags.Dd()(elem)
                 else:
-                    self(tags.Dd()(submenu))
+                    yield tags.Dd()(submenu)
 
 
 class TempyList:
     """TempyList is a class factory, it works for both ul and ol lists (TODO: dl).
     See TempyListMeta for TempyList methods and docstings."""
 
+    # List classes are built once per list type
+    _list_classes = {}
+
     def __new__(cls, typ=None, struct=None):
         try:
             typ = struct.pop("_typ")
@@ -116,5 +121,8 @@ class TempyList:
             except AttributeError:
                 raise WidgetError(cls, "TempyList type not expected.")
         typ = typ or tags.Ul
-        cls_typ = type("TempyList%s" % typ.__name__, (TempyListMeta, typ), {})
+        try:
+            cls_typ = cls._list_classes[typ]
+        except KeyError:
+            cls_typ = cls._list_classes[typ] = type("TempyList%s" % typ.__name__, (TempyListMeta, typ), {})
         return cls_typ(struct=struct)
@@ -46,6 +46,7 @@ class TempyPage(tags.Html):
     def set_doctype(self, doctype):
         """Changes the <meta> charset tag (default charset in init is UTF-8)."""
         self.doctype.type_code = doctype
+        self._invalidate_html()
         return self
 
     def set_charset(self, charset):
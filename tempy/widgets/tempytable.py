@@ -4,9 +4,10 @@
 Table Widget
 """
 from copy import copy
-from itertools import zip_longest
+from numbers import Number
 
 import tempy.tags as tags
+from ..bases import TempyClass
 from ..tools import AdjustableList
 from ..exceptions import WidgetDataError
 
@@ -77,22 +78,27 @@ class TempyTable(tags.Table):
         if not resize_x:
             self._check_row_size(max_data_x)
 
-        for t_row, d_row in zip_longest(self.body, data):
-            if not d_row:
-                t_row.remove()
-            else:
-                if not t_row:
-                    t_row = tags.Tr().append_to(self.body)
-                if normalize:
-                    d_row = AdjustableList(d_row).ljust(max_data_x, None)
-                for t_cell, d_cell in zip_longest(t_row, d_row):
-                    if not t_cell and resize_x:
-                        t_cell = tags.Td().append_to(t_row)
-                    t_cell.empty()
-                    if d_cell is not None:
-                        t_cell(d_cell)
+        self.body.extend_children(
+            self._make_row(AdjustableList(d_row).ljust(max_data_x, None) if normalize else d_row)
+            for d_row in data
+            if d_row
+        )
         return self
 
+    @staticmethod
+    def _make_cell(cell_tag, cell_data):
+        cell = cell_tag()
+        if cell_data is not None:
+            if isinstance(cell_data, (str, Number, TempyClass)):
+                cell.extend_children((cell_data, ))
+            else:
+                cell(cell_data)
+        return cell
+
+    def _make_row(self, row_data, cell_tag=tags.Td):
+        """Builds a row with a cell for each given data, None data makes an empty cell."""
+        return tags.Tr().extend_children(self._make_cell(cell_tag, cell_data) for cell_data in row_data)
+
     def clear(self):
         return self.body.empty()
 
@@ -100,7 +106,7 @@ class TempyTable(tags.Table):
         """Adds a row at the end of the table"""
         if not resize_x:
             self._check_row_size(row_data)
-        self.body(tags.Tr()(tags.Td()(cell) for cell in row_data))
+        self.body.extend_children((self._make_row(row_data), ))
         return self
 
     def pop_row(self, idr=None, tags=False):
@@ -121,7 +127,7 @@ class TempyTable(tags.Table):
         part_instance = part_tag().append_to(self)
         if not hasattr(self, part):
             setattr(self, part, part_instance)
-        return part_instance(tags.Tr()(inner_tag()(col) for col in data))
+        return part_instance.extend_children((self._make_row(data, inner_tag), ))
 
     def make_header(self, head):
         """Makes the header row from the given data."""
@@ -224,9 +230,9 @@ class TempyTable(tags.Table):
 
         for row_index, col_index in gen:
             cell = self.body.childs[row_index].childs[col_index]
-            self.body.childs[row_index].childs[col_index] = tags.Th()(cell.childs[0])
-            self.body.childs[row_index].childs[col_index].attrs = copy(cell.attrs)
-            self.body.childs[row_index].childs[col_index].attr(scope=scope_tag)
+            head_cell = tags.Th()(cell.childs[0])
+            head_cell.attrs = copy(cell.attrs)
+            cell.replace_with(head_cell.attr(scope=scope_tag))
 
     def is_row_within_bounds(self, row_index):
         if row_index >= 0 and (row_index < len(self.body.childs)):
@@ -6,7 +6,7 @@ import unittest
 
 from tempy.elements import Tag
 from tempy.exceptions import WrongContentError, WrongArgsError, TagError, DOMModByKeyError, DOMModByIndexError
-from tempy.tags import Div, A, P, Html, Head, Body, Pre, Br, Td
+from tempy.tags import Div, A, P, Html, Head, Body, Pre, Br, Td, Comment
 from tempy.tempy import DOMElement, Escaped
 
 
@@ -47,6 +47,27 @@ class TestDOMelement(unittest.TestCase):
         self.assertEqual(self.page.first(), head)
         self.assertEqual(self.page.last(), head)
 
+    def test_init_hooks(self):
+        class Titled:
+            def init(self):
+                self(title=P()('title'))
+
+        class Base(Div):
+            def init(self):
+                self(Br())
+
+        class Page(Titled, Base):
+            def init(self):
+                self(body=Div())
+
+        # Hooks collected for a base class are not inherited by the subclasses
+        self.assertEqual(Base().render(), '<div><br/></div>')
+        page = Page()
+        self.assertEqual(page.render(), '<div><br/><p>title</p><div></div></div>')
+        self.assertIs(page.body, page.childs[2])
+        self.assertEqual(Div()._init_hooks, ())
+        self.assertIn('_init_hooks', Page.__dict__)
+
     def test_own_index(self):
         d = Div()
         p = Div()(d)
@@ -79,6 +100,56 @@ class TestDOMelement(unittest.TestCase):
         new = self.page.clone()
         self.assertEqual(new, self.page)
 
+    def test_clone_preserves_everything(self):
+        from tempy import Content
+        from tempy.widgets import TempyTable
+        page = Div(klass='page', style='color: red')(
+            head=P(id='title')(Content('title')), body=Div(data={'user': 'bob'})(Escaped('<b>'), Content('user'), 3),
+        )
+        page.inject(title='Hello')
+        expected = page.render()
+        self.assertIn('<p id="title">Hello</p><div><b>bob3</div>', expected)
+        new = page.clone()
+        self.assertEqual(new.render(), expected)
+        self.assertIs(new.head, new.childs[0])
+        self.assertIs(new.body.parent, new)
+        self.assertEqual(new.body.content_data, {'user': 'bob'})
+        new.attr(klass='new').css(color='blue')
+        new.body.inject(user='alice')
+        self.assertEqual(page.render(), expected)
+        self.assertNotEqual(new.render(), expected)
+
+        table = TempyTable(data=[[1, 2], [3, 4]], head=True)
+        table_copy = table * 2
+        self.assertEqual(table_copy[1].render(), table.render())
+        self.assertIs(table_copy[1].header, table_copy[1].childs[1])
+
+        # Deeper than the recursion limit
+        top = node = Div()
+        for _ in range(3000):
+            node = Div().append_to(node)
+        self.assertEqual(top.clone().render(), top.render())
+
+    def test_clone_element_attributes(self):
+        from tempy.widgets import TempyPage
+        page = TempyPage()
+        new = page.clone()
+        self.assertIsNot(new.doctype, page.doctype)
+        self.assertIs(new.head, new.childs[0])
+        new.set_doctype('html_strict')
+        self.assertTrue(page.render().startswith('<!DOCTYPE HTML>'))
+        self.assertFalse(new.render().startswith('<!DOCTYPE HTML>'))
+
+        class Named(Div):
+            __slots__ = ('inner', )
+
+        element = Named()(inner=P())
+        new = element.clone()
+        self.assertIs(new.inner, new.childs[0])
+        self.assertIsNot(new.inner, element.inner)
+        # Kept on the class, not in a module level table keeping runtime made classes alive
+        self.assertEqual(Named.__dict__['_copied_state_cache'], (('inner', 'attrs'), False))
+
     def test_after(self):
         new1 = Div().append_to(self.page)
         new2 = Div()
@@ -555,10 +626,31 @@ class TestDOMelement(unittest.TestCase):
         li = list(a.dfs_postorder(reverse=True))
         self.assertTrue(li == [c, d, b, a])
 
+    def test_dft_equal_strings(self):
+        a = Div()('x', Div()('x'), 'x')
+        self.assertEqual(list(a.dfs_postorder()), ['x', 'x', a.childs[1], 'x', a])
+
+    def test_deep_walks(self):
+        # Deeper than the recursion limit
+        top = node = Div()
+        for i in range(3000):
+            node = Div()('text %d' % i, Comment('c')).append_to(node)
+        self.assertEqual(len(list(top.dfs_preorder())), 1 + 3000 * 3)
+        self.assertEqual(len(list(top.dfs_postorder(reverse=True))), 1 + 3000 * 3)
+        self.assertEqual(len(top.find('div')), 3000)
+        self.assertEqual(top.text().split(), ' '.join('text %d' % i for i in range(3000)).split())
+        code = top.to_code()
+        self.assertTrue(code.startswith('Div()(Div()("""text 0""", Comment("c"), Div()("""text 1"""'))
+        self.assertEqual(code.count('Div()'), 3001)
+        top.apply_function(str.upper)
+        self.assertEqual(node.childs[0], 'TEXT 2999')
+        self.assertEqual(top.render().count('TEXT'), 3000)
+
     def test_escaped(self):
         html_escapable_content = '"&<>£¢ì'
         t_escaped = Div()(Escaped(html_escapable_content))
         self.assertEqual(t_escaped.render(), '<div>"&<>£¢ì</div>')
+        self.assertEqual(Div()(Escaped('<b>x</b>'), 'y').to_code(), 'Div()(Escaped("""<b>x</b>"""), """y""")')
 
     def test_find(self):
         tag = Div()(A(), A(), Pre(), Br(), Div()(A()), foo=Br())
@@ -588,3 +680,141 @@ class TestDOMelement(unittest.TestCase):
         list_ele = ['foo', 'Br', 'Div', 'Pre']
         result = tag.map(list_ele)
         self.assertEqual(len(result), 4)
+
+    def test_own_index_maintained(self):
+        import random
+        rnd = random.Random(42)
+        container = Div()(P() for _ in range(20))
+        for _ in range(500):
+            operation = rnd.randrange(8)
+            childs = [child for child in container.childs if isinstance(child, DOMElement)]
+            if operation == 0:
+                container(P())
+            elif operation == 1 and childs:
+                rnd.choice(childs).after(P(), 'text')
+            elif operation == 2 and childs:
+                rnd.choice(childs).before(P())
+            elif operation == 3 and childs:
+                container.pop(rnd.randrange(-len(container), len(container)))
+            elif operation == 4 and len(container) > 2:
+                container._detach_childs(1, rnd.randrange(2, len(container)))
+            elif operation == 5 and childs:
+                container.prepend(P(), P())
+            elif operation == 6:
+                container(named=P())
+                container.pop('named')
+            elif operation == 7 and childs:
+                rnd.choice(childs).remove()
+            for index, child in enumerate(container.childs):
+                if isinstance(child, DOMElement):
+                    self.assertEqual(child._own_index, index)
+        removed = P()
+        container(removed)
+        container.childs.remove(removed)
+        self.assertEqual(removed._own_index, -1)
+
+    def test_extend_children(self):
+        div = Div()(P())
+        self.assertEqual(div.render(), '<div><p></p></div>')
+        childs = [P()('foo'), 'bar', None, A()]
+        self.assertIs(div.extend_children(child for child in childs), div)
+        self.assertEqual(div.render(), '<div><p></p><p>foo</p>bar<a></a></div>')
+        self.assertEqual(len(div), 4)
+        for index, child in enumerate(div.childs):
+            if isinstance(child, DOMElement):
+                self.assertIs(child.parent, div)
+                self.assertEqual(child._own_index, index)
+        with self.assertRaises(TagError):
+            Br().extend_children([P()])
+
+    def test_find_indexed(self):
+        import random
+        from tempy.index import TreeIndex
+        rnd = random.Random(7)
+        page = Div()(Div(id='main')(P(klass='text'), A(), foo=Br()), Pre())
+        page.build_index()
+        self.addCleanup(page.drop_index)
+        index = page._tree_index
+        self.assertIsInstance(index, TreeIndex)
+        for _ in range(300):
+            nodes = [page] + list(page.find())
+            node = rnd.choice([n for n in nodes if isinstance(n, DOMElement)])
+            operation = rnd.randrange(7)
+            if operation in (0, 2) and isinstance(node, (Br, Pre)):
+                continue
+            if operation == 0:
+                node(rnd.choice((P, A, Div))(klass=rnd.choice(('text', 'link'))))
+            elif operation == 1 and node is not page:
+                node.remove()
+            elif operation == 2:
+                node(foo=Br())
+            elif operation == 3 and isinstance(node, Tag):
+                node.toggle_class('text')
+            elif operation == 4 and isinstance(node, Tag):
+                node.attr(id=rnd.choice(('main', 'side')))
+            elif operation == 5 and node is not page and isinstance(node, Tag):
+                node.replace_with(Div(klass='link')(A()))
+            elif operation == 6 and node.childs:
+                node.empty()
+            scope = rnd.choice([n for n in [page] + list(page.find()) if isinstance(n, DOMElement)])
+            for selector, names in ((A, None), ('Div', None), (None, 'foo'), ('Br', 'foo'), (Tag, None)):
+                indexed = scope.find(selector, names)
+                page._tree_index = None
+                self.assertEqual(indexed, scope.find(selector, names))
+                page._tree_index = index
+            elements = [n for n in page.find() if isinstance(n, Tag)] + [page]
+            for css_class in ('text', 'link'):
+                self.assertEqual(index.by_class(css_class), {n for n in elements if n.has_class(css_class)})
+            for css_id in ('main', 'side'):
+                self.assertEqual(index.by_id(css_id), {n for n in elements if n.attrs.get('id') == css_id})
+
+        # Trees inserted in an indexed tree lose their own index, detached subtrees leave the index
+        other = Div()(A())
+        other.build_index()
+        page(other)
+        self.assertIsNone(other._tree_index)
+        self.assertIn(other, page.find(Div))
+        other.remove()
+        self.assertNotIn(other, page.find(Div))
+        self.assertEqual(other.find(A), set(other.childs))
+
+    def test_index_collected(self):
+        import gc
+        from tempy.index import TreeIndex
+        page = Div()(P()).build_index()
+        index = page._tree_index
+        self.assertIn(index, TreeIndex.active)
+        page.drop_index()
+        self.assertNotIn(index, TreeIndex.active)
+        page.build_index()
+        active = len(TreeIndex.active)
+        del page, index
+        gc.collect()
+        self.assertEqual(len(TreeIndex.active), active - 1)
+
+    def test_ancestry_cache(self):
+        top = node = Div()
+        for _ in range(3000):
+            child = Div()
+            node(child)
+            node = child
+        # Deeper than the recursion limit
+        self.assertEqual(node._depth, 3000)
+        self.assertIs(node.root, top)
+        self.assertTrue(top.is_root)
+        self.assertFalse(node.is_root)
+        self.assertTrue(top.render(pretty=True).endswith('\n' + '\t' * 3000 + '<div></div>' + '</div>' * 3000))
+
+        middle = top.childs[0].childs[0]
+        other = Div()(P())
+        middle.move(other.childs[0])
+        self.assertIs(node.root, other)
+        self.assertEqual(node._depth, 3000 - 2 + 2)
+        middle.remove()
+        self.assertIs(node.root, middle)
+        self.assertEqual(node._depth, 3000 - 2)
+        self.assertEqual(middle._depth, 0)
+        self.assertTrue(middle.is_root)
+        other.childs[0].append(middle)
+        self.assertIs(node.root, other)
+        self.assertEqual(middle._depth, 2)
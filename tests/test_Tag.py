@@ -25,6 +25,19 @@ class TestTag(unittest.TestCase):
         with self.assertRaises(TagError):
             TestTag()._get__tag()
 
+    def test_tag_name_cached_on_class(self):
+        class TestTag(Div): pass
+        self.assertEqual(TestTag._class_tag(), 'div')
+
+        class TestTag(Div):
+            __tag = 'custom'
+        self.assertEqual(TestTag._class_tag(), 'custom')
+        self.assertEqual(TestTag().render(), '<custom></custom>')
+
+        class SubTestTag(TestTag): pass
+        self.assertEqual(SubTestTag._class_tag(), 'custom')
+        self.assertIsNone(Tag._class_tag())
+
     def test_tag_set_attrs(self):
         d = Div(klass='test_css_class')
         self.assertTrue('klass' in d.attrs)
@@ -170,3 +183,40 @@ class TestTag(unittest.TestCase):
         x.set_id('anotherCssId')
         self.assertTrue(x.is_id('anotherCssId'))
         self.assertEqual(x.id(), 'anotherCssId')
+
+    def test_compact_layout(self):
+        d = Div()
+        self.assertFalse(hasattr(d, '__dict__'))
+        self.assertEqual(dict(d.attrs), {})
+        self.assertFalse(d.has_class('foo'))
+        self.assertNotIn('klass', d.attrs)
+        d.add_class('foo')
+        self.assertEqual(d.attrs['klass'], {'foo'})
+        self.assertNotIn('style', d.attrs)
+        # style and class are rendered first, as when they were always present
+        self.assertEqual(Div(id='x', klass='foo').css(color='red').render(),
+                         '<div style="color: red;" class="foo" id="x"></div>')
+
+        class Custom(Div):
+            pass
+
+        custom = Custom()
+        custom.foo = 'bar'
+        self.assertEqual(custom.foo, 'bar')
+
+    def test_named_childs_slotted(self):
+        child = P()
+        d = Div()(named=child)
+        self.assertIs(d.named, child)
+        self.assertIs(d.pop('named')[0], child)
+        self.assertFalse(hasattr(d, 'missing'))
+        with self.assertRaises(AttributeError):
+            Div().missing
+
+    def test_pickle_and_deepcopy(self):
+        import pickle
+        from copy import deepcopy
+        d = Div(klass='foo', id='bar')(P()('text'), Br(), named=P())
+        for copied in (pickle.loads(pickle.dumps(d)), deepcopy(d)):
+            self.assertEqual(copied.render(), d.render())
+            self.assertIs(copied.named, copied[2])
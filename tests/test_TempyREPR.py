@@ -4,9 +4,10 @@
 """
 import unittest
 
-from tempy import TempyREPR, T
+from tempy import TempyREPR, TempyPlace, T, Content
+from tempy.renderer import clear_caches, _REPR_RESOLUTIONS, _REPR_CANDIDATES, _CHILD_DISPATCH
 from tempy.exceptions import IncompleteREPRError
-from tempy.tags import Div, Td, P, Span, Table, Tr, A, Pre
+from tempy.tags import Div, Td, P, Span, Table, Tr, A, Pre, Ul, Li, B
 from tempy.places import *
 
 
@@ -192,3 +193,182 @@ class TestSingleTags(unittest.TestCase):
 
         inst = Obj()
         self.assertEqual(Pre()(Span()(A()(inst))).render(), '<pre><span><a>footest</a></span></pre>')
+
+    def test_resolution_cache(self):
+        class Obj:
+            foo = 'foo'
+            bar = 'bar'
+
+            class TestA(BeforeDiv):
+                def repr(self):
+                    self(self.bar)
+
+            class A(BeforeSpan):
+                def repr(self):
+                    self(self.foo + 'test')
+
+        clear_caches()
+        tree = Pre()
+        for _ in range(10):
+            tree(A()(Obj()), Span())
+        tree(A()(Obj()), Div())
+        expected = '<pre>%s<a>bar</a><div></div></pre>' % ('<a>footest</a><span></span>' * 10)
+        self.assertEqual(tree.render(), expected)
+        self.assertEqual(tree.render(), expected)
+        # first A, middle As, last A (before the Div)
+        self.assertEqual(len([k for k in _REPR_RESOLUTIONS if k[0] is Obj]), 3)
+
+    def test_not_positional_scorer(self):
+        class Even(TempyPlace):
+            _base_place = False
+
+            def _reprscore_even(self, container, child):
+                return 2 if child.n % 2 == 0 else 0
+
+        class Obj:
+            def __init__(self, n):
+                self.n = n
+
+            class EvenREPR(Even):
+                def repr(self):
+                    self('even')
+
+            class Span(TempyREPR):
+                def repr(self):
+                    self('odd')
+
+        self.assertEqual(Div()(Span()(Obj(i)) for i in range(4)).render(),
+                         '<div><span>even</span><span>odd</span><span>even</span><span>odd</span></div>')
+        self.assertFalse([k for k in _REPR_RESOLUTIONS if k[0] is Obj])
+
+    def test_place_scorers(self):
+        self.assertEqual([s.__name__ for s in InsideDiv._place_scorers()], ['_reprscore_container_parent'])
+        self.assertEqual([s.__name__ for s in NearDiv._place_scorers()], ['_reprscore_container_siblings'])
+
+    def test_patched_classes_reused(self):
+        parents, classes = [], []
+
+        class Obj:
+            foo = 'foo'
+
+            class Span(TempyREPR):
+                def repr(self):
+                    parents.append(self.parent)
+                    classes.append(self.__class__)
+                    self(self.foo)
+
+        clear_caches()
+        container = Span()(Obj() for _ in range(10))
+        page = Div()(container)
+        self.assertEqual(page.render(), '<div><span>%s</span></div>' % ('foo' * 10))
+        self.assertEqual(len(set(classes)), 1)
+        self.assertEqual(Span._patched_views[Obj.Span], classes[0])
+        self.assertTrue(all(parent is container for parent in parents))
+
+    def test_private_attributes_lookup(self):
+        class Obj:
+            _name = 'model name'
+            _depth = 'model depth'
+
+            class Div(TempyREPR):
+                def label(self):
+                    return 'repr label'
+
+                def repr(self):
+                    self(P()(self._name), P()(self._depth), P()(self.label()))
+
+            def label(self):
+                return 'model label'
+
+        self.assertEqual(
+            Div()(Obj()).render(), '<div><p>model name</p><p>model depth</p><p>repr label</p></div>'
+        )
+
+    def test_content_placeholders_in_repr(self):
+        class Obj:
+            name = 'foo'
+
+            class Div(TempyREPR):
+                def repr(self):
+                    self(P()(Content('name')), P()(Content('outer')))
+
+        page = Div()(Obj()).inject(outer='bar')
+        self.assertEqual(page.render(), '<div><p>foo</p><p>bar</p></div>')
+
+    def test_batched_skeleton(self):
+        built = []
+
+        class Product:
+            def __init__(self, name, price):
+                self.name = name
+                self.price = price
+
+            class Ul(TempyREPR):
+                _shared_skeleton = True
+
+                def repr(self):
+                    built.append(self)
+                    self(Li()(B()(Content('name')), Span()(Content('price'))))
+
+        products = [Product('p%d' % i, i) for i in range(1, 51)]
+        expected = '<ul>%s</ul>' % ''.join(
+            '<li><b>p%d</b><span>%d</span></li>' % (i, i) for i in range(1, 51)
+        )
+        self.assertEqual(Ul()(products).render(), expected)
+        self.assertEqual(len(built), 1)
+
+        del built[:]
+        self.assertEqual(Ul()(Content('products')).render(products=products),
+                         '<ul>%s</ul>' % ' '.join('<li><b>p%d</b><span>%d</span></li>' % (i, i) for i in range(1, 51)))
+        self.assertEqual(len(built), 1)
+
+    def test_batched_object_dependent_repr(self):
+        built = []
+
+        class Product:
+            def __init__(self, name):
+                self.name = name
+
+            class Ul(TempyREPR):
+                def repr(self):
+                    built.append(self)
+                    self(Li()(self.name))
+
+        products = [Product('p%d' % i) for i in range(10)]
+        self.assertEqual(Ul()(products, 'text', products[:2]).render(),
+                         '<ul>%stext<li>p0</li><li>p1</li></ul>' % ''.join('<li>p%d</li>' % i for i in range(10)))
+        self.assertEqual(len(built), 12)
+
+    def test_batched_dunder_using_repr(self):
+        class Named:
+            def __init__(self, n):
+                self.n = n
+
+            def __str__(self):
+                return 'N%d' % self.n
+
+            class Div(TempyREPR):
+                def repr(self):
+                    self(P()(str(self.obj)))
+
+        self.assertEqual(Div()([Named(1), Named(2)]).render(), '<div><p>N1</p><p>N2</p></div>')
+
+    def test_runtime_classes_collected(self):
+        import gc
+
+        class Obj:
+            class Div(TempyREPR):
+                def repr(self):
+                    self('obj')
+
+        def rounds():
+            for _ in range(50):
+                self.assertEqual(T.Div()(T.P()('x'), Obj()).render(), '<div><p>x</p>obj</div>')
+                T.Div()(T.P()('x')).clone()
+
+        rounds()
+        gc.collect()
+        sizes = len(_CHILD_DISPATCH), len(_REPR_CANDIDATES)
+        rounds()
+        gc.collect()
+        self.assertEqual((len(_CHILD_DISPATCH), len(_REPR_CANDIDATES)), sizes)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""
+import unittest
+
+from tempy import TempyREPR, Content, compile_template
+from tempy.compiler import CompiledTemplate
+from tempy.tags import Html, Head, Title, Body, Div, P, Br, A, Comment, Span
+
+
+class TestCompiler(unittest.TestCase):
+
+    def setUp(self):
+        self.page = Html()(
+            Head()(Title()('compiled')),
+            body=Body()(
+                Div(klass='container', id='main')(
+                    'text & <escaped>',
+                    1,
+                    Br(),
+                    P()('name: ', Content('name')),
+                    A(href='www.foo.com'),
+                    Comment('a comment'),
+                )
+            )
+        )
+
+    def test_compile_returns_template(self):
+        compiled = self.page.compile()
+        self.assertIsInstance(compiled, CompiledTemplate)
+        self.assertTrue(compiled.source.startswith('def '))
+
+    def test_same_output_as_render(self):
+        compiled = compile_template(self.page)
+        self.assertEqual(compiled(name='foo'), self.page.render(name='foo'))
+        self.assertIn('name: foo', compiled(name='foo'))
+        self.assertIn('name: bar', compiled({'name': 'bar'}))
+
+    def test_pretty(self):
+        compiled = self.page.compile(pretty=True)
+        self.assertEqual(compiled(name='foo'), self.page.render(name='foo', pretty=True))
+
+    def test_static_parts_are_literals(self):
+        compiled = self.page.compile()
+        self.assertIn('<div class="container" id="main">', compiled.source)
+        self.assertEqual(compiled.source.count('_dyn_'), 2)
+
+    def test_static_tree(self):
+        div = Div()(Span()('static'))
+        self.assertEqual(div.compile()(), '<div><span>static</span></div>')
+        self.assertNotIn('_dyn_', div.compile().source)
+
+    def test_tempy_repr(self):
+        class Model:
+            foo = 'foo'
+
+            class Div(TempyREPR):
+                def repr(self):
+                    self(P()(self.foo))
+
+        div = Div()(Model())
+        self.assertEqual(div.compile()(), div.render())
+        self.assertEqual(div.compile()(), '<div><p>foo</p></div>')
+
+    def test_dynamic_root(self):
+        self.assertEqual(Comment('root').compile()(), '<!-- root -->')
+
+    def test_leaf_childs(self):
+        class Plain:
+            def __str__(self):
+                return '<plain>'
+
+        from tempy.tempy import Escaped
+        div = Div()(Escaped('<b>x</b>'), 2.5, Plain())
+        compiled = div.compile()
+        self.assertEqual(compiled(), div.render())
+        self.assertIn('<div><b>x</b>2.5', compiled.source)
+        self.assertEqual(compiled.source.count('_dyn_'), 1)
+
+    def test_deep_tree(self):
+        # Deeper than the recursion limit
+        top = node = Div()
+        for _ in range(5000):
+            node = Div()('x').append_to(node)
+        node(Content('name'))
+        self.assertEqual(top.compile()(name='deep'), top.render(name='deep'))
+
+    def test_stale(self):
+        compiled = self.page.compile()
+        self.assertFalse(compiled.stale)
+        self.page.render(name='foo')
+        self.assertFalse(compiled.stale)
+        self.page.body.childs[0].childs[3].attr(id='name')
+        self.assertTrue(compiled.stale)
+        self.assertFalse(self.page.compile().stale)
+        self.assertFalse(Comment('root').compile().stale)
@@ -4,10 +4,11 @@
 """
 import unittest
 from copy import copy
+from threading import Thread
 from collections import Counter
-from tempy.tags import Div, P
+from tempy.tags import Div, P, B
 from tempy import Content
-from tempy.exceptions import ContentError
+from tempy.exceptions import ContentError, WrongContentError
 
 
 class TestTag(unittest.TestCase):
@@ -106,3 +107,124 @@ class TestTag(unittest.TestCase):
         tag = Div()()
         tag.inject(**self.test_contents)
         self.assertTrue(tag.content_data, self.test_contents)
+
+    def test_render_does_not_modify_tree(self):
+        d = Div()(P()(Content(name='test1')))
+        self.assertEqual(d.render(test1='foo'), '<div><p>foo</p></div>')
+        self.assertEqual(d.content_data, {})
+        self.assertEqual(d.render(), '<div><p></p></div>')
+
+    def test_render_data_precedence(self):
+        inner = P()(Content(name='test1'))
+        d = Div()(inner).inject(test1='injected')
+        self.assertEqual(d.render(), '<div><p>injected</p></div>')
+        self.assertEqual(d.render(test1='rendered'), '<div><p>rendered</p></div>')
+        self.assertEqual(d.render({'test1': 'from_dict'}), '<div><p>from_dict</p></div>')
+        inner.inject(test1='nearest')
+        self.assertEqual(d.render(test1='rendered'), '<div><p>nearest</p></div>')
+        self.assertEqual(d.content_data, {'test1': 'injected'})
+
+    def test_interleaved_iter_render(self):
+        d = Div()(P()(Content(name='test1')) for _ in range(20))
+        foo, bar = d.iter_render(chunk_size=1, test1='foo'), d.iter_render(chunk_size=1, test1='bar')
+        foo_chunks, bar_chunks = [], []
+        for foo_chunk, bar_chunk in zip(foo, bar):
+            foo_chunks.append(foo_chunk)
+            bar_chunks.append(bar_chunk)
+        self.assertEqual(''.join(foo_chunks), d.render(test1='foo'))
+        self.assertEqual(''.join(bar_chunks), d.render(test1='bar'))
+
+    def test_concurrent_render(self):
+        d = Div()(P()(Content(name='test1')) for _ in range(100))
+        results = {}
+
+        def render(value):
+            results[value] = [d.render(test1=value) for _ in range(10)]
+
+        threads = [Thread(target=render, args=(str(i), )) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for value, renders in results.items():
+            for rendered in renders:
+                self.assertEqual(rendered, '<div>%s</div>' % ('<p>%s</p>' % value * 100))
+
+    def test_scoped_resolution(self):
+        class CountingData(dict):
+            lookups = Counter()
+
+            def __getitem__(self, key):
+                self.lookups[key] += 1
+                return super().__getitem__(key)
+
+        page = Div()(
+            Div()(P()(Content('price'), Content('currency')) for _ in range(10)),
+            Div(klass='other')(P()(Content('price')), P()(Content('missing'))),
+        )
+        page.content_data = CountingData(price=10, currency='EUR')
+        other = page.childs[1]
+        other.inject(price=20)
+        expected = '<div><div>%s</div><div class="other"><p>20</p><p></p></div></div>' % ('<p>10EUR</p>' * 10)
+        self.assertEqual(page.render(), expected)
+        # Every name is resolved once per scope
+        self.assertEqual(CountingData.lookups, Counter(price=1, currency=1, missing=1))
+        self.assertEqual(page.render(currency='USD'), expected.replace('EUR', 'USD'))
+        self.assertEqual(other.render(), '<div class="other"><p>20</p><p></p></div>')
+        self.assertEqual(other.render(price=30), '<div class="other"><p>30</p><p></p></div>')
+
+    def test_template_items(self):
+        template = P()(Content('name'), '-', Content('role'))
+        template.inject(role='default')
+        page = Div()(Content('people', t_repr=template))
+        people = [{'name': 'Luke', 'role': 'jedi'}, {'name': 'Han'}, {}]
+        self.assertEqual(page.render(people=people), '<div><p>Luke-jedi</p> <p>Han-default</p> <p>-default</p></div>')
+        # The template is not modified by the items
+        self.assertEqual(template.content_data, {'role': 'default'})
+        with self.assertRaises(WrongContentError):
+            page.render(people=['Luke'])
+
+    def test_concurrent_template_items(self):
+        page = Div()(Content('items', t_repr=P()(Content('value'))))
+        results = {}
+
+        def render(prefix):
+            items = [{'value': '%s%d' % (prefix, i)} for i in range(50)]
+            results[prefix] = [page.render(items=items) for _ in range(10)]
+
+        threads = [Thread(target=render, args=(prefix, )) for prefix in 'abcdefgh']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for prefix, renders in results.items():
+            expected = '<div>%s</div>' % ' '.join('<p>%s%d</p>' % (prefix, i) for i in range(50))
+            for rendered in renders:
+                self.assertEqual(rendered, expected)
+
+    def test_compiled_template_reused(self):
+        template = Div()(P()(Content('value')))
+        content = Content('items', t_repr=template)
+        page = Div()(content)
+        items = [{'value': 'a'}, {'value': 'b'}]
+        self.assertEqual(page.render(items=items), '<div><div><p>a</p></div> <div><p>b</p></div></div>')
+        compiled = content._compiled[False]
+        page.render(items=items)
+        self.assertIs(content._compiled[False], compiled)
+
+        # Modified template
+        template.childs[0].attr(klass='x')
+        self.assertEqual(page.render(items=items[:1]), '<div><div><p class="x">a</p></div></div>')
+        template(P()('added'))
+        self.assertEqual(page.render(items=items[:1]), '<div><div><p class="x">a</p><p>added</p></div></div>')
+        page.inject(items=items[:1])
+        content.apply_function(str.upper)
+        self.assertEqual(page.render(), '<div><div><p class="x">a</p><p>ADDED</p></div></div>')
+
+        # Replaced template, cloned content
+        content._t_repr = P()(Content('value'))
+        self.assertEqual(page.render(items=items[:1]), '<div><p>a</p></div>')
+        new = page.clone()
+        new.childs[0]._t_repr(B()('new'))
+        self.assertEqual(new.render(items=items[:1]), '<div><p>a<b>new</b></p></div>')
+        self.assertEqual(page.render(items=items[:1]), '<div><p>a</p></div>')
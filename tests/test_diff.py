@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""
+import random
+import unittest
+from html.parser import HTMLParser
+
+from tempy import Content, Tag
+from tempy.diff import diff, Patch, REPLACE, SET_ATTR, REMOVE_ATTR, INSERT, REMOVE
+from tempy.tags import Div, P, A, Span, Ul, Li, Br, Html, Body
+
+
+class DOMParser(HTMLParser):
+    """Parses markup in a list of DOM nodes as a browser does: elements are [tag, attrs, child nodes],
+    texts are strings (adjacent texts are a single node), comments are ('comment', data) tuples."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.nodes = []
+        self._open = [self.nodes]
+
+    def _append(self, node):
+        nodes = self._open[-1]
+        if isinstance(node, str) and nodes and isinstance(nodes[-1], str):
+            nodes[-1] += node
+        else:
+            nodes.append(node)
+
+    def handle_starttag(self, tag, attrs):
+        element = [tag, dict(attrs), []]
+        self._append(element)
+        self._open.append(element[2])
+
+    def handle_startendtag(self, tag, attrs):
+        self._append([tag, dict(attrs), []])
+
+    def handle_endtag(self, tag):
+        self._open.pop()
+
+    def handle_data(self, data):
+        self._append(data)
+
+    def handle_comment(self, data):
+        self._append(('comment', data))
+
+    @classmethod
+    def parse(cls, markup):
+        parser = cls()
+        parser.feed(markup)
+        parser.close()
+        return parser.nodes
+
+
+def apply_patches(markup, patches):
+    """Applies the patches to the DOM nodes parsed from markup, as a browser would, returns the patched nodes."""
+    root = DOMParser.parse(markup)
+    for patch in patches:
+        nodes, index = root, 0
+        for position in patch.path:
+            nodes, index = nodes[index][2], position
+        if patch.op == REPLACE:
+            nodes[index:index + 1] = DOMParser.parse(patch.html)
+        elif patch.op == SET_ATTR:
+            nodes[index][1][patch.attr] = patch.html
+        elif patch.op == REMOVE_ATTR:
+            del nodes[index][1][patch.attr]
+        elif patch.op == INSERT:
+            nodes[index][2][patch.index:patch.index] = DOMParser.parse(patch.html)
+        elif patch.op == REMOVE:
+            del nodes[index][2][patch.index]
+    return root
+
+
+class TestDiff(unittest.TestCase):
+
+    def test_no_changes(self):
+        page = Div()(P()('text'), Ul()(Li()(i) for i in range(3)))
+        self.assertEqual(page.diff(page.snapshot()), [])
+
+    def test_patches(self):
+        page = Div(id='main')(P(klass='intro')('hello'), Ul()(Li()(i) for i in range(5)), Br())
+        old = page.snapshot()
+        page.attr(title='Main').remove_attr('id')
+        page[0].childs[0] = 'bye'
+        page[1].pop(1)
+        page[1].append(Li()('new'))
+        page[1][0].add_class('first')
+        page[2].replace_with(Span())
+        patches = page.diff(old)
+        self.assertEqual(patches, [
+            Patch(SET_ATTR, (), attr='title', html='Main'),
+            Patch(REMOVE_ATTR, (), attr='id'),
+            Patch(REPLACE, (2, ), html='<span></span>'),
+            Patch(INSERT, (1, ), index=5, html='<li>new</li>'),
+            Patch(REMOVE, (1, ), index=1),
+            Patch(SET_ATTR, (1, 0), attr='class', html='first'),
+            Patch(REPLACE, (0, 0), html='bye'),
+        ])
+        self.assertEqual(apply_patches(old.html, patches), DOMParser.parse(page.render()))
+
+    def test_render_time_content(self):
+        page = Div()(P()(Content('user')), A(href='/')('home'))
+        old = page.snapshot(user='alice')
+        self.assertEqual(page.diff(old), [Patch(REMOVE, (0, ), index=0)])
+        self.assertEqual(diff(old, page.snapshot(user='bob')), [Patch(REPLACE, (0, 0), html='bob')])
+
+    def test_dom_node_paths(self):
+        from tempy.tempy import Escaped
+        page = Div()('a', 'b', P(id='x')('old'), Content('c'))
+        old = page.snapshot(c=[Span()('1'), 'two', Span()('3')])
+        page[2].childs[0] = 'new'
+        page[2].attr(klass='changed')
+        page.append(Escaped('<b>x</b>y'))
+        patches = diff(old, page.snapshot(c='c'))
+        # 'a' and 'b' are a single text node, the Content renders three nodes and then one
+        self.assertEqual(patches, [
+            Patch(REMOVE, (), index=2),
+            Patch(REMOVE, (), index=2),
+            Patch(REMOVE, (), index=2),
+            Patch(INSERT, (), index=2, html='c<b>x</b>y'),
+            Patch(SET_ATTR, (1, ), attr='class', html='changed'),
+            Patch(REPLACE, (1, 0), html='new'),
+        ])
+        self.assertEqual(apply_patches(old.html, patches), DOMParser.parse(page.render(c='c')))
+        self.assertEqual(apply_patches(page.render(c='c'), diff(page.snapshot(c='c'), page.snapshot())),
+                         DOMParser.parse(page.render()))
+
+    def test_custom_split_markup(self):
+        link = A(href='/old')
+        page = Div()(link, A(href='/same')('text'))
+        old = page.snapshot()
+        link.attr(href='/new')
+        page[1].attr(href='/other')
+        self.assertEqual(page.diff(old), [
+            Patch(SET_ATTR, (1, ), attr='href', html='/other'),
+            Patch(REPLACE, (0, ), html='<a href="/new">/new</a>'),
+        ])
+        html = Html()(Body()(P()('text')))
+        old = html.snapshot()
+        html.doctype.type_code = 'html_strict'
+        self.assertEqual(html.diff(old), [Patch(REPLACE, (), html=html.render())])
+
+    def test_random_changes(self):
+        rnd = random.Random(21)
+        tags = (Div, P, Span, Ul, Li)
+
+        def make(depth=0):
+            element = rnd.choice(tags)()
+            if rnd.random() < 0.3:
+                element.attr(title=str(rnd.randint(0, 3)))
+            for _ in range(rnd.randint(0, 4) if depth < 4 else 0):
+                element.append(make(depth + 1) if rnd.random() < 0.6 else str(rnd.randint(0, 9)))
+            return element
+
+        for _ in range(30):
+            page = Div()(make() for _ in range(4))
+            old = page.snapshot()
+            nodes = [node for node in page.dfs_preorder() if isinstance(node, Tag)]
+            for node in rnd.sample(nodes, min(len(nodes), 6)):
+                change = rnd.randint(0, 3)
+                if change == 0:
+                    node.append(make(3))
+                elif change == 1 and node.childs:
+                    node.pop(rnd.randrange(len(node.childs)))
+                elif change == 2 and node.attrs:
+                    node.attr(title='changed')
+                elif node is not page and node.parent is not None:
+                    node.replace_with(make(3))
+            self.assertEqual(apply_patches(old.html, page.diff(old)), DOMParser.parse(page.render()))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""
+import unittest
+
+from tempy import TempyREPR, Content, Escaped, Prototype
+from tempy.tags import Html, Head, Title, Body, Div, P, Pre, Nav, A
+from tempy.widgets import TempyTable
+
+
+class TestPrototype(unittest.TestCase):
+
+    def setUp(self):
+        self.layout = Html()(
+            Head()(Title()(Content('title'))),
+            body=Body()(
+                Div(id='main')(P()('static'), Content('user')),
+                Div(klass='side')(Pre()('x'), Escaped('<b>e</b>')),
+                Nav()(A(href='/')('home')),
+            )
+        )
+
+    def test_instance(self):
+        expected = self.layout.render(title='t', user='u')
+        base = Prototype(self.layout)
+        page = base.instance()
+        self.assertEqual(page.render(title='t', user='u'), expected)
+        # Dynamic elements and their ancestors are copied, static subtrees are shared
+        main, side, nav = page.body.childs
+        self.assertIsNone(main._prototype)
+        self.assertIs(side._prototype, base.tree.body.childs[1])
+        self.assertIs(nav._prototype, base.tree.body.childs[2])
+
+        page.inject(title='instance')
+        side.attr(id='changed')
+        self.assertIsNotNone(side._prototype)
+        side(P()('added'))
+        self.assertIsNone(side._prototype)
+        self.assertIs(side.childs[0].parent, side)
+        self.assertIs(side.childs[0]._prototype, base.tree.body.childs[1].childs[0])
+        self.assertEqual(
+            page.render(user='bob'),
+            expected.replace('<title>t<', '<title>instance<').replace('u</div>', 'bob</div>')
+            .replace('<div class="side"><pre>x</pre><b>e</b>',
+                     '<div class="side" id="changed"><pre>x</pre><b>e</b><p>added</p>')
+        )
+        # Neither the layout nor the next instances see the changes
+        self.assertEqual(self.layout.render(title='t', user='u'), expected)
+        self.assertEqual(base.instance().render(title='t', user='u'), expected)
+
+    def test_layout_modified(self):
+        base = Prototype(self.layout)
+        page = base.instance()
+        self.layout.body.childs[1].childs[0]('layout')
+        self.assertEqual(page.body.childs[1].childs[0].childs, ['x'])
+        self.assertIn('<pre>x</pre>', base.instance().render())
+
+    def test_pretty(self):
+        page = Prototype(self.layout).instance()
+        page.body.childs[2].wrap(Div())
+        self.layout.body.childs[2].wrap(Div())
+        self.assertEqual(page.render(pretty=True, title='t', user='u'),
+                         self.layout.render(pretty=True, title='t', user='u'))
+
+    def test_repr_objects(self):
+        class Obj:
+            def __init__(self, name):
+                self.name = name
+
+            class Div(TempyREPR):
+                def repr(self):
+                    self(P()(self.name))
+
+        layout = Div()(Div()(Obj('shared'), P()('static')), Div()('static'))
+        page = Prototype(layout).instance()
+        self.assertIsNone(page.childs[0]._prototype)
+        page.childs[0].childs[0].name = 'changed'
+        self.assertEqual(page.render(), '<div><div><p>changed</p><p>static</p></div><div>static</div></div>')
+
+    def test_named_childs(self):
+        table = TempyTable(data=[[1, 2], [3, 4]], head=True)
+        table_copy = Prototype(table).instance()
+        table_copy.header.childs[0].childs[0].attr(klass='head')
+        table_copy.populate([[5, 6]])
+        self.assertEqual(table.render(), '<table><tbody><tr><td>3</td><td>4</td></tr></tbody>'
+                                         '<thead><tr><th>1</th><th>2</th></tr></thead></table>')
+        self.assertEqual(table_copy.render(), '<table><tbody><tr><td>5</td><td>6</td></tr></tbody>'
+                                              '<thead><tr><th class="head">1</th><th>2</th></tr></thead></table>')
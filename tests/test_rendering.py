@@ -3,10 +3,32 @@
 @author: Federico Cerchiari <federicocerchiari@gmail.com>
 """
 import os
+import asyncio
 import unittest
+from io import StringIO, BytesIO
 from collections import Counter
-from tempy.tags import Html, Head, Body, Link, Div, A, P, Meta, Title
-from tempy import render_template
+from tempy.tags import Html, Head, Body, Link, Div, A, P, Meta, Title, Ul
+from tempy import render_template, Content, Css, Escaped, TempyREPR
+from tempy.tags import Comment
+from tempy.tags import Li, Span
+from tempy.places import NearSpan, NearDiv
+from tempy.renderer import child_dispatch, LEAF, SPLIT, ELEMENT, OBJECT
+from tempy.parallel import ParallelRenderer
+from tempy.widgets import TempyPage
+
+
+class ParallelItem:
+
+    def __init__(self, name):
+        self.name = name
+
+    class ItemNearSpan(NearSpan):
+        def repr(self):
+            self('span:', self.name)
+
+    class ItemNearDiv(NearDiv):
+        def repr(self):
+            self('div:', self.name)
 
 
 class TestRender(unittest.TestCase):
@@ -39,3 +61,262 @@ class TestRender(unittest.TestCase):
             )
         )
         self.assertEqual(Counter(page.render()), Counter(expected))
+
+    def test_render_into(self):
+        page = Html()(Head()(Title('test_title')), body=Body()(Div()(P()('àè', Content('cont')) for _ in range(10))))
+        expected = page.render(cont='foo')
+
+        stream = StringIO()
+        self.assertIs(page.render_into(stream, cont='foo'), stream)
+        self.assertEqual(stream.getvalue(), expected)
+
+        stream = StringIO()
+        page.render_into(stream, pretty=True)
+        self.assertEqual(stream.getvalue(), page.render(pretty=True))
+
+        buffer = bytearray()
+        page.render_into(buffer, cont='foo')
+        self.assertEqual(buffer.decode('utf-8'), expected)
+
+        stream = BytesIO()
+        page.render_into(stream, encoding='latin-1', cont='foo')
+        self.assertEqual(stream.getvalue(), expected.encode('latin-1'))
+
+    def test_render_into_content_and_css(self):
+        content = Content(content=[Div()('foo'), 'bar', {'a': 1, 'b': [2, 3]}])
+        stream = StringIO()
+        content.render_into(stream)
+        self.assertEqual(stream.getvalue(), content.render())
+        self.assertEqual(stream.getvalue(), '<div>foo</div> bar 1 2 3')
+
+        css = Css({'div': {'color': 'red'}})
+        stream = StringIO()
+        css.render_into(stream)
+        self.assertEqual(stream.getvalue(), css.render())
+
+    def test_child_dispatch(self):
+        class Model:
+            class Div(TempyREPR):
+                def repr(self):
+                    self('model')
+
+        class NoRepr:
+            def __str__(self):
+                return '<no repr>'
+
+        self.assertEqual(child_dispatch('a')[0], LEAF)
+        self.assertEqual(child_dispatch(1)[0], LEAF)
+        self.assertEqual(child_dispatch(Escaped('<b>'))[0], LEAF)
+        self.assertEqual(child_dispatch(NoRepr())[0], LEAF)
+        self.assertEqual(child_dispatch(Div())[0], SPLIT)
+        self.assertEqual(child_dispatch(Comment('c'))[0], ELEMENT)
+        self.assertEqual(child_dispatch(Content('c'))[0], ELEMENT)
+        self.assertEqual(child_dispatch(Model())[0], OBJECT)
+        self.assertIs(child_dispatch('a'), child_dispatch('b'))
+
+        div = Div()('a<', 1, 2.5, True, Escaped('<b>'), NoRepr(), Model(), Comment('c'), P()('p'))
+        self.assertEqual(div.render(), '<div>a&lt;12.5True<b>&lt;no repr&gt;model<!-- c --><p>p</p></div>')
+        self.assertEqual(div.text(), 'a< 1 2.5 True <b> <no repr> model  p')
+
+
+class TestStaticCache(unittest.TestCase):
+
+    def setUp(self):
+        self.footer = Div(klass='footer')(P()('footer %d' % i) for i in range(3)).cache_markup()
+        self.page = Div()(Div(klass='dynamic')(Content('message')), self.footer)
+
+    def assertRenders(self, element, expected, **kwargs):
+        # First render marks the static subtrees, the second caches them, the third uses the cache
+        for _ in range(3):
+            self.assertEqual(element.render(**kwargs), expected)
+
+    def test_static_subtree_cached(self):
+        expected = self.page.render(message='first')
+        self.page.render(message='first')
+        self.assertEqual(self.footer._html_cache, self.footer.render())
+        self.assertIs(self.page._html_cache, False)
+        self.assertEqual(self.page.render(message='second'), expected.replace('first', 'second'))
+        self.assertEqual(self.page.render(message='foo', pretty=True),
+                         self.page.render(message='foo', pretty=True))
+
+    def test_modifiers_invalidate(self):
+        inner = self.footer[1]
+        modifications = (
+            (lambda: inner('added'), '<p>footer 1added</p>'),
+            (lambda: inner.attr(id='x'), '<p id="x">footer 1added</p>'),
+            (lambda: inner.add_class('cls'), '<p class="cls" id="x">footer 1added</p>'),
+            (lambda: inner.remove_attr('id'), '<p class="cls">footer 1added</p>'),
+            (lambda: inner.remove_class('cls'), '<p>footer 1added</p>'),
+            (lambda: inner.css(color='red'), '<p style="color: red;">footer 1added</p>'),
+            (lambda: inner.pop(), '<p style="color: red;">footer 1</p>'),
+            (lambda: inner.apply_function(str.upper), '<p style="color: red;">FOOTER 1</p>'),
+            (lambda: inner.empty(), '<p style="color: red;"></p>'),
+            (lambda: inner.wrap_inner(A()), '<p style="color: red;"><a></a></p>'),
+        )
+        self.assertRenders(self.footer, '<div class="footer"><p>footer 0</p><p>footer 1</p><p>footer 2</p></div>')
+        for modify, expected in modifications:
+            modify()
+            self.assertRenders(self.footer, '<div class="footer"><p>footer 0</p>%s<p>footer 2</p></div>' % expected)
+
+    def test_tree_changes_invalidate(self):
+        moving = self.footer[0]
+        self.assertRenders(self.footer, '<div class="footer"><p>footer 0</p><p>footer 1</p><p>footer 2</p></div>')
+        target = Div()(P()('target')).cache_markup()
+        self.assertRenders(target, '<div><p>target</p></div>')
+        moving.move(target[0])
+        self.assertRenders(self.footer, '<div class="footer"><p>footer 1</p><p>footer 2</p></div>')
+        self.assertRenders(target, '<div><p>target<p>footer 0</p></p></div>')
+        moving.wrap(A())
+        self.assertRenders(target, '<div><p>target<a><p>footer 0</p></a></p></div>')
+        moving.remove()
+        self.assertRenders(target, '<div><p>target<a></a></p></div>')
+
+    def test_dynamic_childs(self):
+        class Model:
+            class Div(TempyREPR):
+                def repr(self):
+                    self(self.value)
+
+        model = Model()
+        element = Div()(P()(model), P()(A()(Content('link'))), Comment('comment')).cache_markup()
+        for value in ('foo', 'bar'):
+            model.value = value
+            self.assertRenders(element, '<div><p>%s</p><p><a>%s</a></p><!-- comment --></div>' % (value, value),
+                               link=value)
+
+    def test_not_cached_by_default(self):
+        element = Div()(P()('text'))
+        self.assertRenders(element, '<div><p>text</p></div>')
+        self.assertIs(element._html_cache, True)
+        element[0].childs[0] = 'changed'
+        self.assertEqual(element.render(), '<div><p>changed</p></div>')
+        element.cache_markup()
+        self.assertRenders(element, '<div><p>changed</p></div>')
+        self.assertEqual(element._html_cache, '<div><p>changed</p></div>')
+        self.assertIs(element[0]._html_cache, True)
+        element.cache_markup(False)
+        element[0].childs[0] = 'again'
+        self.assertEqual(element.render(), '<div><p>again</p></div>')
+
+    def test_page_doctype(self):
+        page = TempyPage().cache_markup()
+        self.assertRenders(page, page.render())
+        page.set_doctype('html_strict')
+        self.assertIn('HTML 4.01', page.render())
+
+    def test_copy_does_not_share_attrs(self):
+        element = Div(klass='foo', style={'color': 'red'}).cache_markup()
+        self.assertRenders(element, '<div style="color: red;" class="foo"></div>')
+        copied = element.clone()
+        copied.add_class('bar')
+        copied.css(color='blue')
+        self.assertRenders(element, '<div style="color: red;" class="foo"></div>')
+
+
+class TestAsyncRender(unittest.TestCase):
+
+    @staticmethod
+    async def slow(value, delay=0.05, log=None):
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(value)
+        return value
+
+    @staticmethod
+    async def numbers(count):
+        for i in range(count):
+            await asyncio.sleep(0)
+            yield i
+
+    def test_render_async(self):
+        page = Div()(P()(Content('user')), Ul()(Content('items')), P()(Content('user')), Content('missing'))
+        log = []
+        user = self.slow('bob', 0.1, log)
+        rendered = asyncio.run(page.render_async(user=user, items=self.numbers(3), missing=self.slow('x', 0.05, log)))
+        self.assertEqual(rendered, '<div><p>bob</p><ul>0 1 2</ul><p>bob</p>x</div>')
+        # Sources are resolved concurrently, the shared one only once
+        self.assertEqual(log, ['x', 'bob'])
+        self.assertEqual(page.render(user='alice'), '<div><p>alice</p><ul></ul><p>alice</p></div>')
+
+    def test_render_async_plain_and_injected(self):
+        page = Div()(Content('name'), Content('title'))
+        page.inject(title=self.slow('mr'))
+        self.assertEqual(asyncio.run(page.render_async(name='bob')), '<div>bobmr</div>')
+        self.assertEqual(asyncio.run(Content(content=self.slow('bob')).render_async()), 'bob')
+
+    def test_render_async_failure(self):
+        log = []
+
+        async def fail():
+            raise ValueError('db down')
+
+        page = Div()(Content('ok'), Content('fail'))
+        with self.assertRaises(ValueError):
+            asyncio.run(page.render_async(ok=self.slow('ok', 0.05, log), fail=fail()))
+        self.assertEqual(log, [])
+
+    def test_iter_render_async(self):
+        page = Div()(P()('head'), P()(Content('slow')), Div()(Content('items')))
+        timeline = []
+
+        async def collect():
+            chunks = []
+            async for chunk in page.iter_render_async(chunk_size=1, slow=self.slow('resolved', 0.05, timeline),
+                                                      items=self.numbers(2)):
+                timeline.append(chunk)
+                chunks.append(chunk)
+            return ''.join(chunks)
+
+        self.assertEqual(asyncio.run(collect()), '<div><p>head</p><p>resolved</p><div>0 1</div></div>')
+        # The markup before the slow content is yielded before the source is resolved
+        self.assertLess(timeline.index('head'), timeline.index('resolved'))
+
+    def test_iter_render_async_custom_render(self):
+        class Custom(Div):
+            def render(self, *args, **kwargs):
+                return '[%s]' % super().render(*args, **kwargs)
+
+        page = Div()(Custom()(Content('name')))
+
+        async def collect():
+            return ''.join([chunk async for chunk in page.iter_render_async(name=self.slow('bob'))])
+
+        self.assertEqual(asyncio.run(collect()), '<div>[<div>bob</div>]</div>')
+
+
+class TestParallelRender(unittest.TestCase):
+
+    def make_page(self, count=30):
+        items = []
+        for i in range(count):
+            items.append(Li()(Content('name'), i))
+            # Objects rendered according to their container's neighbours, also across the chunks edges
+            items.append(Span() if i % 2 else Div()(Content('title')))
+            items.append(Li()(ParallelItem(i)))
+        return Html()(Head()(Title()(Content('title'))), Body()(P()('list'), Ul()(items), Ul()(Li()(1))))
+
+    def target(self, page):
+        return page.childs[1].childs[1]
+
+    def test_parallel_render(self):
+        page = self.make_page()
+        page.inject(title='Items')
+        expected = page.render(name='bob')
+        renderer = ParallelRenderer(workers=2, threshold=10, chunk_size=7)
+        self.assertEqual(renderer.render(page, name='bob'), expected)
+        self.assertEqual(renderer.render(page, {'name': 'alice'}), page.render(name='alice'))
+        targets, ancestors = renderer._targets(page)
+        self.assertEqual(targets, {id(self.target(page)): (1, 1)})
+        self.assertEqual(ancestors, {id(page), id(page.childs[1])})
+        # Render bindings of the outer elements reach the workers
+        self.assertEqual(renderer.render(Div()(Content('name'), page), name='bob'), '<div>bob%s</div>' % expected)
+        # parallel is a content name like any other for render
+        self.assertEqual(Div()(Content('parallel')).render(parallel=2), '<div>2</div>')
+
+    def test_parallel_render_fallback(self):
+        page = self.make_page()
+        renderer = ParallelRenderer(workers=2, threshold=10)
+        # Pretty renders and trees without large childs lists are rendered serially
+        self.assertEqual(renderer.render(page, pretty=True, name='bob'), page.render(pretty=True, name='bob'))
+        self.assertEqual(renderer._targets(self.make_page(3)), ({}, set()))
+        self.assertEqual(renderer.render(self.make_page(3), name='bob'), self.make_page(3).render(name='bob'))
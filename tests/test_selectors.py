@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""
+import unittest
+
+from tempy.exceptions import SelectorError
+from tempy.selectors import compile_selector
+from tempy.tags import Html, Body, Div, P, A, Span, Ul, Li
+
+
+class TestSelectors(unittest.TestCase):
+    def setUp(self):
+        self.page = Html()(body=Body()(
+            Div(id='main', klass='box big')(
+                P(klass='intro')('intro'),
+                P()('text', A(href='https://tempy.org/docs', title='docs')('link')),
+                Span(),
+                P(klass='last'),
+            ),
+            Div(klass='box')(Ul()(Li()(i) for i in range(6))),
+        ))
+        self.main = self.page.body.childs[0]
+        self.lis = self.page.body.childs[1].childs[0].childs
+
+    def assertFound(self, selector, expected):
+        self.assertEqual(self.page.find(selector), set(expected))
+
+    def test_simple_selectors(self):
+        main, other = self.page.body.childs
+        self.assertFound('div', (main, other))
+        self.assertFound('Div', (main, other))
+        self.assertFound('#main', (main, ))
+        self.assertFound('.box', (main, other))
+        self.assertFound('div.box.big', (main, ))
+        self.assertEqual(len(self.page.find('*')), 15)
+
+    def test_attribute_selectors(self):
+        link = self.main.childs[1].childs[1]
+        self.assertFound('a[title]', (link, ))
+        self.assertFound('a[title=docs]', (link, ))
+        self.assertFound('a[title="doc"]', ())
+        self.assertFound('[href^="https://"]', (link, ))
+        self.assertFound("[href$='/docs']", (link, ))
+        self.assertFound('[href*=tempy]', (link, ))
+        self.assertFound('[class~=big]', (self.main, ))
+        self.assertFound('[class=box]', (self.page.body.childs[1], ))
+
+    def test_combinators(self):
+        intro, text, span, last = self.main.childs
+        self.assertFound('div > p', (intro, text, last))
+        self.assertFound('body p', (intro, text, last))
+        self.assertFound('html > p', ())
+        self.assertFound('p + span', (span, ))
+        self.assertFound('.intro ~ p', (text, last))
+        self.assertFound('span ~ .intro', ())
+        self.assertFound('#main > p a', (text.childs[1], ))
+        self.assertFound('p, span', (intro, text, span, last))
+        self.assertFound(['span', '.intro'], (intro, span))
+
+    def test_nth_child(self):
+        lis = self.lis
+        self.assertFound('li:nth-child(2n+1)', lis[0::2])
+        self.assertFound('li:nth-child(odd)', lis[0::2])
+        self.assertFound('li:nth-child(even)', lis[1::2])
+        self.assertFound('li:nth-child(3)', (lis[2], ))
+        self.assertFound('li:nth-child(-n+3)', lis[:3])
+        self.assertFound('li:nth-last-child(2)', (lis[4], ))
+        self.assertFound('li:first-child', (lis[0], ))
+        self.assertFound('li:last-child', (lis[-1], ))
+        # text childs are not counted as siblings
+        self.assertFound('a:first-child', (self.main.childs[1].childs[1], ))
+
+    def test_find_scope_and_names(self):
+        self.main(named=Span(klass='x'))
+        self.assertEqual(self.main.find('span'), {self.main.childs[2], self.main.named})
+        self.assertEqual(self.main.find('span', names='named'), {self.main.named})
+        self.assertEqual(self.main.find('body span.x'), {self.main.named})
+        self.assertEqual(self.main.find('li'), set())
+
+    def test_indexed(self):
+        expected = {selector: self.page.find(selector) for selector in (
+            'div', '#main', '.box', 'li:nth-child(odd)', 'p + span', '*', 'a[title]', 'body > .box li',
+        )}
+        self.page.build_index()
+        self.addCleanup(self.page.drop_index)
+        for selector, found in expected.items():
+            self.assertEqual(self.page.find(selector), found)
+        self.assertEqual(self.main.find('*'), set(self.main.find()) - {'intro', 'text', 'link'})
+
+    def test_compiled_cache(self):
+        self.assertIs(compile_selector('div > p'), compile_selector('div > p'))
+
+    def test_errors(self):
+        for selector in ('div >', '> p', 'p:hover', 'p:nth-child(x)', 'div$', 'p div.x,', 'div #'):
+            with self.assertRaises(SelectorError):
+                compile_selector(selector)
+
+    def test_deep_descendants(self):
+        top = node = Span()
+        chain = []
+        for depth in range(2000):
+            node = (P() if depth == 1000 else Div()).append_to(node)
+            chain.append(node)
+        self.assertEqual(top.find('p div div'), set(chain[1002:]))
+        self.assertEqual(top.find('span div p div'), set(chain[1001:]))
+        self.assertEqual(top.find('a div div'), set())
+        self.assertEqual(top.find('span > div div'), set(chain[1:1000]) | set(chain[1001:]))
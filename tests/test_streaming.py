@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Federico Cerchiari <federicocerchiari@gmail.com>
+"""
+import asyncio
+import unittest
+
+from tempy import TempyREPR, Content, StreamingResponse
+from tempy.tags import Html, Head, Body, Div, P, Br, A, Comment, Table, Tr, Td
+
+
+class TestIterRender(unittest.TestCase):
+
+    def setUp(self):
+        class Model:
+            foo = 'foo'
+
+            class Div(TempyREPR):
+                def repr(self):
+                    self(P()(self.foo))
+
+        self.page = Html()(
+            Head(),
+            body=Body()(
+                Div(klass='container')(
+                    'text & <escaped>', 1, Br(), Content('name'), A(href='www.foo.com'), Comment('comment'), Model()
+                ),
+                Table()(Tr()(Td()(i) for i in range(10)) for _ in range(100)),
+            )
+        )
+
+    def test_same_output_as_render(self):
+        for pretty in (False, True):
+            expected = self.page.render(name='foo', pretty=pretty)
+            for chunk_size in (1, 100, 100000):
+                chunks = list(self.page.iter_render(name='foo', pretty=pretty, chunk_size=chunk_size))
+                self.assertEqual(''.join(chunks), expected)
+
+    def test_chunk_size(self):
+        chunks = list(self.page.iter_render(chunk_size=100))
+        self.assertTrue(len(chunks) > 1)
+        self.assertTrue(all(len(chunk) >= 100 for chunk in chunks[:-1]))
+        self.assertEqual(len(list(self.page.iter_render(chunk_size=10 ** 6))), 1)
+
+    def test_not_splittable_root(self):
+        self.assertEqual(list(Comment('root').iter_render()), ['<!-- root -->'])
+
+
+class TestStreamingResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.page = Div()(P()(Content('name')) for _ in range(50))
+
+    def test_iter(self):
+        body = b''.join(StreamingResponse(self.page, name='foo', chunk_size=10))
+        self.assertEqual(body, self.page.render(name='foo').encode())
+
+    def test_wsgi(self):
+        started = []
+        response = StreamingResponse(self.page, status=404, headers=[('X-Test', '1')], name='foo')
+        body = b''.join(response({}, lambda status, headers: started.append((status, headers))))
+        self.assertEqual(started[0][0], '404 Not Found')
+        self.assertIn(('X-Test', '1'), started[0][1])
+        self.assertIn(('Content-Type', 'text/html; charset=utf-8'), started[0][1])
+        self.assertEqual(body, self.page.render(name='foo').encode())
+
+    def test_asgi(self):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        response = StreamingResponse(self.page, chunk_size=10, name='foo')
+        asyncio.run(response.asgi({'type': 'http'}, None, send))
+        self.assertEqual(messages[0]['type'], 'http.response.start')
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertFalse(messages[-1]['more_body'])
+        body = b''.join(m['body'] for m in messages[1:])
+        self.assertEqual(body, self.page.render(name='foo').encode())
+
+    def test_asgi_async_contents(self):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def name():
+            await asyncio.sleep(0.01)
+            return 'foo'
+
+        asyncio.run(StreamingResponse(self.page, chunk_size=10, name=name()).asgi({'type': 'http'}, None, send))
+        body = b''.join(m['body'] for m in messages[1:])
+        self.assertEqual(body, self.page.render(name='foo').encode())